@@ -0,0 +1,66 @@
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from db.models import MyUser
+
+
+class RevokedUsers:
+    """
+    Множество id деактивированных пользователей в памяти процесса.
+    Перечитывается из БД не реже раза в refresh_interval секунд,
+    поэтому деактивация в другом процессе видна с этой задержкой.
+    """
+
+    def __init__(self, refresh_interval):
+        self.refresh_interval = refresh_interval
+        self._ids = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        ids = {
+            str(user_id)
+            for user_id in MyUser.objects.filter(is_active=False).values_list('id', flat=True)
+        }
+        with self._lock:
+            self._ids = ids
+            self._loaded_at = time.monotonic()
+
+    def _refresh_if_stale(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval:
+            self.refresh()
+
+    def __contains__(self, user_id):
+        self._refresh_if_stale()
+        return str(user_id) in self._ids
+
+    def add(self, user_id):
+        with self._lock:
+            self._ids.add(str(user_id))
+
+
+revoked_users = RevokedUsers(settings.JWT_REVOCATION_REFRESH)
+
+
+def revoke_user(user_id):
+    revoked_users.add(user_id)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Пользователь собирается из claims токена без запроса к БД,
+    деактивированные пользователи отсекаются по revoked_users.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+
+        if user.pk in revoked_users:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
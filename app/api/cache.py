@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from db.cache import model_versions
+
+# имена view с кэшем ответов, для статистики попаданий
+CACHED_VIEWS = set()
+
+
+def metrics_key(view_name, hit):
+    return f'cache-metrics:{view_name}:{"hit" if hit else "miss"}'
+
+
+def record(view_name, hit):
+    key = metrics_key(view_name, hit)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cache_stats():
+    keys = {
+        (name, hit): metrics_key(name, hit)
+        for name in CACHED_VIEWS
+        for hit in (True, False)
+    }
+    values = cache.get_many(keys.values())
+    return {
+        name: {
+            'hit': values.get(keys[(name, True)], 0),
+            'miss': values.get(keys[(name, False)], 0),
+        }
+        for name in sorted(CACHED_VIEWS)
+    }
+
+
+class CachedResponseMixin:
+    """
+    Кэш ответов GET с ключом по версиям cache_models (db.cache).
+
+    cache_response = False или имя класса в settings.RESPONSE_CACHE_DISABLED
+    отключает кэш для view, заголовок запроса Cache-Control: no-cache - для запроса.
+    """
+    cache_models = ()
+    cache_response = True
+    cache_timeout = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        CACHED_VIEWS.add(cls.__name__)
+
+    def cache_enabled(self, request):
+        return (
+            self.cache_response
+            and settings.RESPONSE_CACHE_TIMEOUT > 0
+            and type(self).__name__ not in settings.RESPONSE_CACHE_DISABLED
+            and 'no-cache' not in request.headers.get('Cache-Control', '')
+        )
+
+    def cached_response(self, request, build, scope=None):
+        """build() - ответ без кэша, scope - версии моделей в пределах объекта."""
+        if not self.cache_enabled(request):
+            return build()
+
+        name = type(self).__name__
+        versions = '.'.join(str(version) for version in model_versions(*self.cache_models, scope=scope))
+        key = f'response:{name}:{versions}:{request.get_host()}:{request.get_full_path()}'
+
+        cached = cache.get(key)
+        if cached is not None:
+            record(name, True)
+            data, status_code, headers = cached
+            response = Response(data, status=status_code, headers=headers)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record(name, False)
+        response = build()
+        if response.status_code == 200:
+            cache.set(
+                key,
+                (
+                    response.data,
+                    response.status_code,
+                    {name: value for name, value in response.items() if name != 'Content-Type'}
+                ),
+                self.cache_timeout or settings.RESPONSE_CACHE_TIMEOUT
+            )
+        response['X-Cache'] = 'MISS'
+        return response
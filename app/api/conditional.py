@@ -0,0 +1,123 @@
+import hashlib
+import uuid
+
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from db.models import Order, OrderProgress, ProductDetail, StaffProfile
+
+
+def latest(*values):
+    return max((value for value in values if value), default=None)
+
+
+def conditional_response(request, build, last_modified, *parts):
+    """
+    Условный GET: ETag от пути запроса, last_modified и parts (счетчики строк),
+    Last-Modified - last_modified. Если у клиента актуальная версия,
+    возвращает 304 без вызова build().
+
+    Списки передают last_modified=None: строка, ушедшая из выборки, не сдвигает
+    максимум updated_at вперед, и If-Modified-Since вернул бы устаревший 304.
+    Их свежесть проверяется только по ETag.
+    """
+    etag = '"%s"' % hashlib.md5(
+        repr((request.get_full_path(), last_modified, *parts)).encode()
+    ).hexdigest()
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+        if response.status_code != 200:
+            return response
+
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def order_list_validators(queryset):
+    """(None, parts) списка заказов с клиентами и деталями одним запросом."""
+    row = queryset.order_by().aggregate(
+        updated=Max('updated_at'),
+        clients_updated=Max('client__updated_at'),
+        details_updated=Max('order_products__details__updated_at'),
+        count=Count('id', distinct=True),
+        details_count=Count('order_products__details', distinct=True),
+    )
+    return (
+        None,
+        latest(row['updated'], row['clients_updated'], row['details_updated']),
+        row['count'],
+        row['details_count']
+    )
+
+
+def order_validators(order_id):
+    """
+    (last_modified, counts) заказа с деталями, счетчиками OrderProgress и
+    сотрудниками счетчиков (в ответе их fullname) одним запросом с
+    подзапросами; None, если заказа нет.
+    """
+    try:
+        order_id = uuid.UUID(str(order_id))
+    except ValueError:
+        return None
+
+    progress = OrderProgress.objects.filter(order=OuterRef('pk')).order_by().values('order')
+    details = ProductDetail.objects.filter(order_product__order=OuterRef('pk')).order_by().values('order_product__order')
+    staff = StaffProfile.objects.filter(progress__order=OuterRef('pk')).order_by().values('progress__order')
+
+    row = (
+        Order.objects
+        .filter(id=order_id)
+        .annotate(
+            progress_updated=Subquery(progress.annotate(value=Max('updated_at')).values('value')),
+            progress_count=Subquery(progress.annotate(value=Count('id')).values('value')),
+            details_updated=Subquery(details.annotate(value=Max('updated_at')).values('value')),
+            details_count=Subquery(details.annotate(value=Count('id')).values('value')),
+            staff_updated=Subquery(staff.annotate(value=Max('updated_at')).values('value')),
+            client_updated=F('client__updated_at'),
+        )
+        .values(
+            'updated_at',
+            'client_updated',
+            'progress_updated',
+            'progress_count',
+            'details_updated',
+            'details_count',
+            'staff_updated'
+        )
+        .first()
+    )
+    if row is None:
+        return None
+
+    return (
+        latest(
+            row['updated_at'],
+            row['client_updated'],
+            row['progress_updated'],
+            row['details_updated'],
+            row['staff_updated']
+        ),
+        (row['progress_count'] or 0, row['details_count'] or 0)
+    )
+
+
+def statement_list_validators(queryset):
+    """(None, parts) списка заявок."""
+    row = queryset.order_by().aggregate(
+        updated=Max('updated_at'),
+        products_updated=Max('product__updated_at'),
+        staff_updated=Max('staff__updated_at'),
+        count=Count('id'),
+    )
+    return (
+        None,
+        latest(row['updated'], row['products_updated'], row['staff_updated']),
+        row['count']
+    )
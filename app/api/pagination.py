@@ -1,7 +1,153 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+import uuid
+from base64 import b64decode, b64encode
 
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-class StandardPagination(PageNumberPagination):
+
+def approximate_count(queryset):
+    """Оценка количества строк планировщиком Postgres вместо COUNT(*)."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по ключу (created_at, id) в порядке BaseModel.Meta.ordering.
+    Каждая страница - один индексный запрос без OFFSET и COUNT(*).
+    """
     page_size = 20
     page_size_query_param = 'page_size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    approximate_count_query_param = 'approximate_count'
+    approximate_count_header = 'X-Approximate-Count'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        self.count = None
+        if request.query_params.get(self.approximate_count_query_param) in ('1', 'true'):
+            self.count = approximate_count(queryset)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) |
+                Q(created_at=created_at, id__lt=pk)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            created_at, pk = b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            created_at = parse_datetime(created_at)
+            pk = uuid.UUID(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return created_at, pk
+
+    def encode_cursor(self, instance):
+        # страница может состоять из строк .values()
+        if isinstance(instance, dict):
+            created_at, pk = instance['created_at'], instance['id']
+        else:
+            created_at, pk = instance.created_at, instance.pk
+        position = f'{created_at.isoformat()}|{pk}'
+        return b64encode(position.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1])
+        )
+
+    def get_paginated_response(self, data):
+        response = Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+        if self.count is not None:
+            response[self.approximate_count_header] = str(self.count)
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор следующей страницы из поля next',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Размер страницы, не больше {self.max_page_size}',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.approximate_count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Вернуть оценку общего количества в заголовке {self.approximate_count_header}',
+                'schema': {'type': 'boolean'},
+            },
+        ]
@@ -1,28 +1,59 @@
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.permissions import BasePermission
 
+from db.cache import staff_cache_key
 from db.enums import StaffRole
+from db.models import StaffProfile
 
 
-class IsDirector(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.staff_profile.role == StaffRole.DIRECTOR
+def get_staff(request):
+    """
+    (role, staff_profile_id) пользователя запроса или (None, None).
+    Берется из кэша, чтобы проверка прав не ходила в БД на каждый скан.
+    """
+    if hasattr(request, '_staff'):
+        return request._staff
 
+    staff = (None, None)
+    user = request.user
+    if user and user.is_authenticated:
+        key = staff_cache_key(user.pk)
+        staff = cache.get(key)
+        if staff is None:
+            staff = StaffProfile.objects.filter(user_id=user.pk).values_list('role', 'id').first() or (None, None)
+            cache.set(key, staff, settings.STAFF_CACHE_TIMEOUT)
 
-class IsReceiver(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.staff_profile.role == StaffRole.RECEIVER
+    request._staff = staff
+    return staff
 
 
-class IsOTK(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.staff_profile.role == StaffRole.OTK
+def get_staff_profile_id(request):
+    return get_staff(request)[1]
+
 
+class StaffRolePermission(BasePermission):
+    role = None
 
-class IsPacker(BasePermission):
     def has_permission(self, request, view):
-        return request.user.staff_profile.role == StaffRole.PACKER
+        return get_staff(request)[0] == self.role
 
 
-class IsMarker(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.staff_profile.role == StaffRole.MARKER
+class IsDirector(StaffRolePermission):
+    role = StaffRole.DIRECTOR
+
+
+class IsReceiver(StaffRolePermission):
+    role = StaffRole.RECEIVER
+
+
+class IsOTK(StaffRolePermission):
+    role = StaffRole.OTK
+
+
+class IsPacker(StaffRolePermission):
+    role = StaffRole.PACKER
+
+
+class IsMarker(StaffRolePermission):
+    role = StaffRole.MARKER
@@ -1,7 +1,8 @@
+from django.utils import timezone
 from rest_framework import serializers
 
 from api.serializers.get_or_none import serialize_instance
-from db.models import ClientProfile, MyUser, StaffProfile, Order, OrderProduct, ProductDetail, Statement
+from db.models import ClientProfile, MyUser, StaffProfile, Order, OrderProduct, ProductDetail, Statement, PDFImportJob
 
 
 class MyUserSerializer(serializers.ModelSerializer):
@@ -205,4 +206,97 @@ class StatementUpdateSerializer(serializers.Serializer):
     is_success = serializers.BooleanField()
 
 
+class PDFImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PDFImportJob
+        fields = [
+            'id',
+            'type',
+            'status',
+            'first_page',
+            'last_page',
+            'pages_total',
+            'pages_done',
+            'result',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at'
+        ]
+
+
+class PDFImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    order_id = serializers.UUIDField()
+    product_title = serializers.CharField()
+    color = serializers.CharField(required=False)
+    size = serializers.CharField(required=False)
+    first_page = serializers.IntegerField(
+        min_value=1,
+        required=False
+    )
+    last_page = serializers.IntegerField(
+        min_value=1,
+        required=False
+    )
+
+    def validate_file(self, value):
+        if value.content_type != "application/pdf":
+            raise serializers.ValidationError("Только PDF допустим")
+        return value
 
+    def validate_order_id(self, value):
+        if not Order.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Заказ не найден")
+        return value
+
+    def validate(self, attrs):
+        first_page, last_page = attrs.get('first_page'), attrs.get('last_page')
+        if first_page and last_page and first_page > last_page:
+            raise serializers.ValidationError({"last_page": "Должна быть не меньше first_page"})
+        return attrs
+
+
+class PDFImportJobCreatedSerializer(serializers.Serializer):
+    job_id = serializers.UUIDField()
+
+
+class PDFImportJobQuerySerializer(serializers.Serializer):
+    job_id = serializers.UUIDField()
+
+
+class ExportSerializer(serializers.Serializer):
+    entity = serializers.ChoiceField(choices=['orders', 'products', 'statements'])
+    fmt = serializers.ChoiceField(
+        choices=['ndjson', 'csv'],
+        default='ndjson'
+    )
+    order_id = serializers.UUIDField(
+        required=False,
+        help_text='Только для entity=products'
+    )
+
+
+class ProductivityReportSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    bucket = serializers.ChoiceField(
+        choices=['hour', 'day'],
+        default='day'
+    )
+    order_id = serializers.UUIDField(required=False)
+
+    max_days = {'hour': 7, 'day': 366}
+
+    def validate(self, attrs):
+        today = timezone.localdate()
+        attrs.setdefault('date_from', attrs.get('date_to', today))
+        attrs.setdefault('date_to', today)
+
+        if attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError({'date_to': 'Должна быть не раньше date_from'})
+        if (attrs['date_to'] - attrs['date_from']).days >= self.max_days[attrs['bucket']]:
+            raise serializers.ValidationError(
+                {'date_from': f"Период не больше {self.max_days[attrs['bucket']]} дн."}
+            )
+        return attrs
@@ -0,0 +1,93 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from db.models import OrderProduct, ProductDetail
+
+# Сериализация списков заказов из .values() без ModelSerializer.
+# Вывод совпадает с api.serializers.director/receiver.OrderSerializer.
+
+DIRECTOR_ORDER_FIELDS = [
+    'id',
+    'order_products',
+    'client_info',
+    'created_at',
+    'updated_at',
+    'status',
+    'client'
+]
+
+RECEIVER_ORDER_FIELDS = [
+    'id',
+    'created_at',
+    'client_info',
+    'order_products'
+]
+
+ORDER_VALUES = [
+    'id',
+    'created_at',
+    'updated_at',
+    'status',
+    'client_id',
+    'client__fullname'
+]
+
+_datetime = serializers.DateTimeField()
+
+
+def order_values(queryset):
+    return queryset.values(*ORDER_VALUES)
+
+
+def order_products_by_order(order_ids):
+    details = defaultdict(list)
+    detail_rows = (
+        ProductDetail.objects
+        .filter(order_product__order_id__in=order_ids)
+        .values_list('order_product_id', 'color', 'size', 'amount')
+    )
+    for order_product_id, color, size, amount in detail_rows:
+        details[order_product_id].append({
+            'color': color,
+            'size': size,
+            'amount': amount
+        })
+
+    order_products = defaultdict(list)
+    product_rows = (
+        OrderProduct.objects
+        .filter(order_id__in=order_ids)
+        .order_by('id')
+        .values_list('id', 'order_id', 'product_title')
+    )
+    for order_product_id, order_id, product_title in product_rows:
+        order_products[order_id].append({
+            'product_title': product_title,
+            'details': details.get(order_product_id, [])
+        })
+
+    return order_products
+
+
+def serialize_orders(rows, fields):
+    """rows - строки order_values(), fields - DIRECTOR_ORDER_FIELDS или RECEIVER_ORDER_FIELDS."""
+    order_products = order_products_by_order([row['id'] for row in rows])
+
+    data = []
+    for row in rows:
+        values = {
+            'id': str(row['id']),
+            'order_products': order_products.get(row['id'], []),
+            'client_info': {
+                'id': row['client_id'],
+                'fullname': row['client__fullname']
+            },
+            'created_at': _datetime.to_representation(row['created_at']),
+            'updated_at': _datetime.to_representation(row['updated_at']),
+            'status': row['status'],
+            'client': row['client_id']
+        }
+        data.append({field: values[field] for field in fields})
+
+    return data
@@ -46,4 +46,38 @@ class CreateProductSerializer(serializers.Serializer):
     color = serializers.CharField()
     size = serializers.CharField()
     internal_code = serializers.CharField()
-    file = serializers.FileField()
\ No newline at end of file
+    file = serializers.FileField()
+
+class BulkReceptionRowSerializer(serializers.Serializer):
+    title = serializers.CharField()
+    color = serializers.CharField()
+    size = serializers.CharField()
+    internal_code = serializers.CharField()
+    file = serializers.CharField(
+        required=False,
+        help_text='Имя поля multipart с файлом кода, по умолчанию internal_code'
+    )
+
+
+class BulkReceptionSerializer(serializers.Serializer):
+    order_id = serializers.UUIDField()
+    manifest = serializers.JSONField(
+        binary=True,
+        help_text='JSON-список строк BulkReceptionRow'
+    )
+
+    def validate_manifest(self, value):
+        if not isinstance(value, list) or not value:
+            raise serializers.ValidationError('Ожидается непустой список строк')
+        return value
+
+
+class BulkReceptionErrorSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    internal_code = serializers.CharField(allow_null=True)
+    errors = serializers.DictField()
+
+
+class BulkReceptionResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    errors = BulkReceptionErrorSerializer(many=True)
@@ -22,3 +22,16 @@ class MarkerFilesSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductCode
         fields = ['file']
+
+
+class BatchWorkSerializer(serializers.Serializer):
+    internal_codes = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=1000
+    )
+
+
+class BatchWorkResultSerializer(serializers.Serializer):
+    internal_code = serializers.CharField()
+    result = serializers.ChoiceField(choices=['ok', 'already_processed', 'not_found'])
@@ -0,0 +1,114 @@
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from api.services import workflow
+from api.services.order_progress import apply_progress, transition_deltas
+from api.services.transitions import swap_code
+from db.enums import CodeType
+from db.models import Product, ProductCode, Work
+
+OK = 'ok'
+ALREADY_PROCESSED = 'already_processed'
+NOT_FOUND = 'not_found'
+
+
+def products_by_internal_code(internal_codes, lock=False):
+    """
+    Изделия пачки одним запросом; при дублях кода - как .first(), самое новое.
+    lock=True - строки блокируются (SELECT ... FOR UPDATE) в постоянном порядке.
+    """
+    queryset = Product.objects.filter(internal_code__in=set(internal_codes))
+    if lock:
+        queryset = queryset.select_for_update().order_by('-created_at', 'id')
+
+    products = {}
+    for product in queryset:
+        products.setdefault(product.internal_code, product)
+    return products
+
+
+def hs_codes_by_product(products):
+    hs_codes = {}
+    codes = (
+        ProductCode.objects
+        .filter(product__in=products, type=CodeType.HS)
+        .values_list('product_id', 'code')
+    )
+    for product_id, code in codes:
+        hs_codes.setdefault(product_id, code)
+    return hs_codes
+
+
+def process_batch(internal_codes, staff_id, name):
+    """
+    Проводит пачку изделий по переходу workflow.TRANSITIONS[name].
+
+    Возвращает результат по каждому коду в порядке запроса. Статусы
+    проверяются по заблокированным строкам одной операцией над множествами,
+    поэтому параллельные пачки и одиночные сканирования не проведут
+    изделие дважды.
+    """
+    transition = workflow.TRANSITIONS[name]
+    if transition.images or transition.rollback:
+        raise ValueError(f'Переход {name} нельзя провести пачкой')
+
+    now = timezone.now()
+
+    results = []
+    changed = []
+    works = []
+    fields = set()
+    deltas = Counter()
+
+    with transaction.atomic():
+        products = products_by_internal_code(internal_codes, lock=True)
+        allowed, _ = workflow.split_allowed(
+            name,
+            {product.id: product.status for product in products.values()}
+        )
+        hs_codes = {}
+        if transition.code == workflow.CODE_TO_HS:
+            hs_codes = hs_codes_by_product(allowed)
+
+        processed = set()
+        for code in internal_codes:
+            product = products.get(code)
+            if not product:
+                results.append({'internal_code': code, 'result': NOT_FOUND})
+                continue
+            if product.id not in allowed or product.id in processed:
+                results.append({'internal_code': code, 'result': ALREADY_PROCESSED})
+                continue
+            processed.add(product.id)
+
+            old_status = product.status
+            product.status = transition.target
+            product.updated_at = now
+            if transition.code:
+                fields.update(swap_code(product, transition.code, hs_codes.get(product.id)))
+
+            changed.append(product)
+            works.append(Work(product=product, staff_id=staff_id, status=transition.target))
+            transition_deltas(product, old_status, added=[(transition.target, staff_id)], deltas=deltas)
+            results.append({'internal_code': code, 'result': OK})
+
+        if changed:
+            Product.objects.bulk_update(changed, ['status', 'updated_at', *sorted(fields)])
+            Work.objects.bulk_create(works)
+            apply_progress(deltas)
+
+    return results
+
+
+def process_otk_batch(internal_codes, staff_id):
+    return process_batch(internal_codes, staff_id, workflow.OTK)
+
+
+def process_packer_batch(internal_codes, staff_id):
+    return process_batch(internal_codes, staff_id, workflow.PACKER)
+
+
+def process_marker_batch(internal_codes, staff_id):
+    return process_batch(internal_codes, staff_id, workflow.MARKER)
@@ -0,0 +1,193 @@
+import csv
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from db.models import Order, Product, Statement
+
+CHUNK_SIZE = 500
+
+
+def _dt(value):
+    return timezone.localtime(value).isoformat() if value else None
+
+
+def iter_orders():
+    orders = (
+        Order.objects
+        .select_related('client')
+        .prefetch_related('order_products__details')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for order in orders:
+        yield {
+            'id': order.id,
+            'created_at': _dt(order.created_at),
+            'status': order.status,
+            'client': order.client_id,
+            'client_fullname': order.client.fullname,
+            'order_products': [
+                {
+                    'product_title': op.product_title,
+                    'details': [
+                        {'color': d.color, 'size': d.size, 'amount': d.amount}
+                        for d in op.details.all()
+                    ]
+                }
+                for op in order.order_products.all()
+            ]
+        }
+
+
+def iter_products(order_id=None):
+    products = Product.objects.all()
+    if order_id:
+        products = products.filter(order_id=order_id)
+
+    products = products.prefetch_related('works__staff').iterator(chunk_size=CHUNK_SIZE)
+    for product in products:
+        yield {
+            'id': product.id,
+            'created_at': _dt(product.created_at),
+            'order': product.order_id,
+            'title': product.title,
+            'color': product.color,
+            'size': product.size,
+            'internal_code': product.internal_code,
+            'old_internal_code': product.old_internal_code,
+            'status': product.status,
+            'works': [
+                {
+                    'id': work.id,
+                    'created_at': _dt(work.created_at),
+                    'status': work.status,
+                    'staff': work.staff_id,
+                    'staff_fullname': work.staff.fullname,
+                    'comment': work.comment
+                }
+                for work in product.works.all()
+            ]
+        }
+
+
+def iter_statements():
+    statements = (
+        Statement.objects
+        .select_related('product', 'staff')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for statement in statements:
+        yield {
+            'id': statement.id,
+            'created_at': _dt(statement.created_at),
+            'type': statement.type,
+            'is_moderated': statement.is_moderated,
+            'product': statement.product_id,
+            'product_title': statement.product.title,
+            'internal_code': statement.product.internal_code,
+            'staff': statement.staff_id,
+            'staff_fullname': statement.staff.fullname if statement.staff else None
+        }
+
+
+# CSV - по строке на самый вложенный элемент
+
+ORDER_COLUMNS = ['id', 'created_at', 'status', 'client', 'client_fullname', 'product_title', 'color', 'size', 'amount']
+PRODUCT_COLUMNS = [
+    'id', 'created_at', 'order', 'title', 'color', 'size', 'internal_code', 'old_internal_code', 'status',
+    'work_id', 'work_created_at', 'work_status', 'staff', 'staff_fullname', 'comment'
+]
+STATEMENT_COLUMNS = [
+    'id', 'created_at', 'type', 'is_moderated', 'product', 'product_title', 'internal_code', 'staff', 'staff_fullname'
+]
+
+
+def order_csv_rows(orders):
+    for order in orders:
+        base = [order[c] for c in ORDER_COLUMNS[:5]]
+        details = [
+            [op['product_title'], d['color'], d['size'], d['amount']]
+            for op in order['order_products']
+            for d in op['details']
+        ]
+        for detail in details or [[None] * 4]:
+            yield base + detail
+
+
+def product_csv_rows(products):
+    for product in products:
+        base = [product[c] for c in PRODUCT_COLUMNS[:9]]
+        works = [
+            [w['id'], w['created_at'], w['status'], w['staff'], w['staff_fullname'], w['comment']]
+            for w in product['works']
+        ]
+        for work in works or [[None] * 6]:
+            yield base + work
+
+
+def statement_csv_rows(statements):
+    for statement in statements:
+        yield [statement[c] for c in STATEMENT_COLUMNS]
+
+
+EXPORTS = {
+    'orders': (iter_orders, ORDER_COLUMNS, order_csv_rows),
+    'products': (iter_products, PRODUCT_COLUMNS, product_csv_rows),
+    'statements': (iter_statements, STATEMENT_COLUMNS, statement_csv_rows),
+}
+
+
+def batched(lines, size=CHUNK_SIZE):
+    """Склеивает строки по size штук, чтобы не ходить в sync-поток за каждой."""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+async def stream_chunks(chunks):
+    """
+    Асинхронный обход синхронного генератора.
+
+    Под ASGI StreamingHttpResponse с синхронным итератором сначала читает
+    его целиком в память, поэтому каждый кусок берется через sync_to_async -
+    в одном потоке запроса, где живет соединение и курсор .iterator().
+    """
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def ndjson_lines(items):
+    encoder = JSONEncoder(ensure_ascii=False)
+    for item in items:
+        yield encoder.encode(item) + '\n'
+
+
+def ndjson_stream(items):
+    return stream_chunks(batched(ndjson_lines(items)))
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def csv_stream(columns, rows):
+    return stream_chunks(batched(csv_lines(columns, rows)))
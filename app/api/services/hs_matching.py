@@ -0,0 +1,87 @@
+from collections import defaultdict
+
+import fitz
+
+from db.models import Product
+
+
+def page_lines(page, clip=None):
+    raw_text = page.get_text("text", clip=clip)
+    return [line.strip() for line in raw_text.split("\n") if line.strip()]
+
+
+def extract_hs_pages(pdf_doc, with_lines=False):
+    """
+    Один проход по документу: код ЧЗ из нижней левой четверти каждой
+    страницы и, при with_lines, все строки текста для сопоставления с SKU.
+    """
+    pages = []
+    for page in pdf_doc:
+        width, height = page.rect.width, page.rect.height
+        clip = fitz.Rect(0, 4/5*height, width/2, height)
+        pages.append({
+            'code': "".join(page_lines(page, clip)),
+            'lines': set(page_lines(page)) if with_lines else None
+        })
+    return pages
+
+
+def build_page_index(pages, skus, sku=None):
+    """
+    {(color, size): [номера страниц по порядку]} и список несопоставленных страниц.
+
+    sku задан - все страницы относятся к нему, иначе страница относится
+    к единственному SKU, цвет и размер которого встречаются в ее строках.
+    """
+    index = defaultdict(list)
+    unmatched = []
+
+    for number, page in enumerate(pages):
+        if sku:
+            index[sku].append(number)
+            continue
+
+        candidates = [
+            (color, size) for color, size in skus
+            if color in page['lines'] and size in page['lines']
+        ]
+        if len(candidates) == 1:
+            index[candidates[0]].append(number)
+        else:
+            unmatched.append(number)
+
+    return index, unmatched
+
+
+def assign_pages(index, products_by_sku, first=0, last=None):
+    """
+    Детерминированное распределение: k-я страница SKU - k-е изделие SKU
+    в порядке (created_at, id). Учитываются только страницы [first, last).
+    Возвращает [(номер страницы, изделие)] по возрастанию страниц.
+    """
+    assignments = []
+    for sku, numbers in index.items():
+        products = products_by_sku.get(sku, [])
+        for k, number in enumerate(numbers):
+            if k >= len(products):
+                break
+            if number < first or (last is not None and number >= last):
+                continue
+            assignments.append((number, products[k]))
+
+    assignments.sort(key=lambda item: item[0])
+    return assignments
+
+
+def products_by_sku(order_id, title, skus=None):
+    products = Product.objects.filter(
+        order_id=order_id,
+        title=title
+    ).order_by('created_at', 'id')
+    if skus is not None:
+        products = products.filter(color__in={c for c, _ in skus}, size__in={s for _, s in skus})
+
+    grouped = defaultdict(list)
+    for product in products:
+        grouped[(product.color, product.size)].append(product)
+    return grouped
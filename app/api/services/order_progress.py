@@ -0,0 +1,227 @@
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from db.enums import ProductStatus
+from db.models import OrderProgress, Product, Work
+
+
+def progress_key(product, status, staff_id=None):
+    return (
+        product.order_id,
+        product.title,
+        product.color,
+        product.size,
+        status,
+        staff_id
+    )
+
+
+def transition_deltas(product, old_status, added=(), removed=(), deltas=None):
+    """
+    Изменения счетчиков при переходе изделия из old_status в product.status.
+    added/removed - пары (status, staff_id) созданных/удаленных работ.
+    """
+    if deltas is None:
+        deltas = Counter()
+
+    if old_status != product.status:
+        if old_status is not None:
+            deltas[progress_key(product, old_status)] -= 1
+        if product.status is not None:
+            deltas[progress_key(product, product.status)] += 1
+
+    for status, staff_id in added:
+        deltas[progress_key(product, status, staff_id)] += 1
+    for status, staff_id in removed:
+        deltas[progress_key(product, status, staff_id)] -= 1
+
+    return deltas
+
+
+def lock_order(item):
+    """Порядок обновления строк OrderProgress; staff_id=None идет первым."""
+    (order_id, title, color, size, status, staff_id), _ = item
+    return str(order_id), title, color, size, status, staff_id is not None, str(staff_id or '')
+
+
+def apply_progress(deltas):
+    """
+    Применяет изменения счетчиков. Вызывать внутри транзакции записи Work.
+    Строки обновляются в постоянном порядке, чтобы параллельные транзакции
+    не блокировали одни и те же счетчики навстречу друг другу.
+    """
+    now = timezone.now()
+    for (order_id, title, color, size, status, staff_id), delta in sorted(deltas.items(), key=lock_order):
+        if not delta:
+            continue
+
+        lookup = {
+            'order_id': order_id,
+            'title': title,
+            'color': color,
+            'size': size,
+            'status': status,
+            'staff_id': staff_id,
+        }
+        updated = OrderProgress.objects.filter(**lookup).update(
+            amount=F('amount') + delta,
+            updated_at=now
+        )
+        if updated:
+            continue
+
+        try:
+            with transaction.atomic():
+                OrderProgress.objects.create(amount=delta, **lookup)
+        except IntegrityError:
+            # строку успел создать параллельный запрос
+            OrderProgress.objects.filter(**lookup).update(
+                amount=F('amount') + delta,
+                updated_at=now
+            )
+
+
+def track_transition(product, old_status, added=(), removed=()):
+    apply_progress(transition_deltas(product, old_status, added, removed))
+
+
+def count_progress(orders=None):
+    """Эталонные значения счетчиков, посчитанные по Product и Work."""
+    products = Product.objects.filter(status__isnull=False)
+    works = Work.objects.all()
+    if orders is not None:
+        products = products.filter(order__in=orders)
+        works = works.filter(product__order__in=orders)
+
+    counters = Counter()
+
+    product_rows = (
+        products
+        .values('order_id', 'title', 'color', 'size', 'status')
+        .annotate(amount=Count('id'))
+    )
+    for row in product_rows:
+        key = (row['order_id'], row['title'], row['color'], row['size'], row['status'], None)
+        counters[key] += row['amount']
+
+    work_rows = (
+        works
+        .values(
+            'product__order_id',
+            'product__title',
+            'product__color',
+            'product__size',
+            'status',
+            'staff_id'
+        )
+        .annotate(amount=Count('id'))
+    )
+    for row in work_rows:
+        key = (
+            row['product__order_id'],
+            row['product__title'],
+            row['product__color'],
+            row['product__size'],
+            row['status'],
+            row['staff_id']
+        )
+        counters[key] += row['amount']
+
+    return counters
+
+
+def collect_order_progress(order):
+    """
+    Сводные данные по заказу из счетчиков OrderProgress (один запрос).
+
+    Возвращает кортеж:
+        status_totals - {status: кол-во изделий}
+        fact_amounts  - {(title, color, size): кол-во принятых изделий}
+        works         - {(title, color, size): [(work_status, fullname, amount), ...]}
+    """
+    status_totals = defaultdict(int)
+    fact_amounts = defaultdict(int)
+    works = defaultdict(list)
+
+    rows = (
+        OrderProgress.objects
+        .filter(order=order)
+        .exclude(amount=0)
+        .values('title', 'color', 'size', 'status', 'staff_id', 'staff__fullname', 'amount')
+        .order_by()
+    )
+    for row in rows:
+        if row['staff_id'] is None:
+            status_totals[row['status']] += row['amount']
+            continue
+
+        key = (row['title'], row['color'], row['size'])
+        works[key].append((row['status'], row['staff__fullname'], row['amount']))
+        if row['status'] == ProductStatus.RECEIVER:
+            fact_amounts[key] += row['amount']
+
+    return status_totals, fact_amounts, works
+
+
+def assemble_order_progress(order, status_totals, fact_amounts, works):
+    summary = {
+        status.name: status_totals.get(status.value, 0)
+        for status in ProductStatus
+    }
+
+    fact_totals = defaultdict(int)
+    for (title, _color, _size), amount in fact_amounts.items():
+        fact_totals[title] += amount
+
+    info = []
+    for op in order.order_products.all():
+        details = op.details.all()
+
+        details_list = []
+        for d in details:
+            key = (op.product_title, d.color, d.size)
+
+            # группировка по статусу
+            status_groups = {}
+            for st, fullname, amount in works.get(key, []):
+                status_groups.setdefault(st, {})
+                status_groups[st][fullname] = status_groups[st].get(fullname, 0) + amount
+
+            works_data = [
+                {
+                    'status': st,
+                    'amount': sum(staffs.values()),
+                    'staffs': [
+                        {'fullname': name, 'amount': cnt}
+                        for name, cnt in staffs.items()
+                    ]
+                }
+                for st, staffs in status_groups.items()
+            ]
+
+            details_list.append({
+                'color': d.color,
+                'size': d.size,
+                'planned_amount': d.amount,
+                'fact_amount': fact_amounts.get(key, 0),
+                'works': works_data
+            })
+
+        info.append({
+            'product_title': op.product_title,
+            'planned_total': sum(d.amount for d in details),
+            'fact_total': fact_totals.get(op.product_title, 0),
+            'details': details_list
+        })
+
+    return {
+        'summary': summary,
+        'info': info
+    }
+
+
+def get_order_progress(order):
+    return assemble_order_progress(order, *collect_order_progress(order))
@@ -0,0 +1,113 @@
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+from PIL import Image
+from django.conf import settings
+
+# меньше страниц дешевле отрисовать в текущем процессе, чем поднимать пул
+PARALLEL_MIN_PAGES = 8
+
+# порог черного для 1-битного режима
+MONO_THRESHOLD = 128
+
+RGB = 'rgb'
+GRAY = 'gray'
+MONO = 'mono'
+
+# пул запускается и из фонового потока многопоточного воркера, а fork при
+# живых потоках может унаследовать захваченные блокировки
+POOL_CONTEXT = multiprocessing.get_context('forkserver')
+
+_worker_doc = None
+
+
+def clip_rect(page, clip):
+    """clip - доли страницы (x0, y0, x1, y1), None - вся страница."""
+    if not clip:
+        return None
+    rect = page.rect
+    return fitz.Rect(
+        rect.x0 + clip[0] * rect.width,
+        rect.y0 + clip[1] * rect.height,
+        rect.x0 + clip[2] * rect.width,
+        rect.y0 + clip[3] * rect.height
+    )
+
+
+def render_page(pdf_doc, index, dpi=300, mode=GRAY, clip=None):
+    """
+    PNG страницы index, закодированный прямо из pixmap.
+
+    mode: rgb - цветной, gray - 8 бит оттенки серого,
+    mono - 1 бит для термопринтеров.
+    """
+    page = pdf_doc[index]
+    pix = page.get_pixmap(
+        dpi=dpi,
+        clip=clip_rect(page, clip),
+        colorspace=fitz.csRGB if mode == RGB else fitz.csGRAY,
+        alpha=False
+    )
+
+    if mode != MONO:
+        return pix.tobytes("png")
+
+    # Pixmap не пишет 1-битный PNG, упаковку в биты делает PIL по буферу pixmap без копии
+    img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+    img = img.point(lambda v: 255 if v >= MONO_THRESHOLD else 0, mode="1")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _init_worker(pdf_bytes):
+    global _worker_doc
+    _worker_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+
+def _render_worker_page(index, dpi, mode, clip):
+    return render_page(_worker_doc, index, dpi, mode, clip)
+
+
+def iter_render_pages(pdf_bytes, indexes, dpi=300, workers=1, mode=GRAY, clip=None):
+    """
+    PNG страниц indexes в том же порядке, по мере готовности.
+
+    При workers > 1 страницы рисуются пулом процессов, каждый процесс
+    открывает документ из pdf_bytes один раз.
+    """
+    indexes = list(indexes)
+    workers = min(workers, len(indexes))
+
+    if workers <= 1 or len(indexes) < PARALLEL_MIN_PAGES:
+        pdf_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        for index in indexes:
+            yield render_page(pdf_doc, index, dpi, mode, clip)
+        return
+
+    count = len(indexes)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=POOL_CONTEXT,
+        initializer=_init_worker,
+        initargs=(pdf_bytes,)
+    ) as executor:
+        yield from executor.map(
+            _render_worker_page,
+            indexes,
+            [dpi] * count,
+            [mode] * count,
+            [clip] * count,
+            chunksize=max(1, count // (workers * 4))
+        )
+
+
+def label_render_options():
+    return {
+        'dpi': settings.LABEL_DPI,
+        'mode': settings.LABEL_COLOR_MODE,
+        'clip': settings.LABEL_CLIP,
+        'workers': settings.PDF_RENDER_WORKERS
+    }
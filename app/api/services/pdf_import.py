@@ -0,0 +1,287 @@
+import threading
+import time
+from datetime import timedelta
+
+import fitz
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.services.hs_matching import extract_hs_pages, build_page_index, assign_pages, products_by_sku
+from api.services.pdf import iter_render_pages, label_render_options
+from db.cache import bump_versions
+from db.enums import CodeType, JobStatus
+from db.labels import store_label
+from db.models import PDFImportJob, Product, ProductCode
+
+# как часто (в страницах) сохранять прогресс задачи
+PROGRESS_STEP = 20
+
+
+def import_hs_codes(pdf_bytes, order_id, title, color=None, size=None,
+                    first_page=None, last_page=None, progress=None):
+    """
+    Коды Честного знака.
+
+    color и size заданы - k-я страница файла достается k-му изделию SKU,
+    иначе страницы сопоставляются с SKU заказа по тексту.
+    first_page/last_page (с 1, включительно) позволяют грузить файл частями.
+    """
+    pdf_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    sku = (color, size) if color and size else None
+
+    if sku:
+        skus = [sku]
+    else:
+        skus = list(
+            Product.objects
+            .filter(order_id=order_id, title=title)
+            .order_by()
+            .values_list('color', 'size')
+            .distinct()
+        )
+
+    pages = extract_hs_pages(pdf_doc, with_lines=sku is None)
+    index, unmatched = build_page_index(pages, skus, sku)
+
+    first = (first_page or 1) - 1
+    last = min(last_page or pdf_doc.page_count, pdf_doc.page_count)
+    assignments = assign_pages(
+        index,
+        products_by_sku(order_id, title, skus),
+        first,
+        last
+    )
+
+    images = iter_render_pages(
+        pdf_bytes,
+        [number for number, _ in assignments],
+        **label_render_options()
+    )
+
+    create_data = []
+    for done, ((number, product), image) in enumerate(zip(assignments, images), start=1):
+        create_data.append(
+            ProductCode(
+                product=product,
+                file=store_label(image),
+                code=pages[number]['code'],
+                type=CodeType.HS
+            )
+        )
+
+        if progress:
+            progress(done, len(assignments))
+
+    with transaction.atomic():
+        ProductCode.objects.filter(
+            product__in=[product for _, product in assignments],
+            type=CodeType.HS
+        ).delete()
+        ProductCode.objects.bulk_create(create_data, batch_size=1000)
+        bump_versions(ProductCode, [code.product_id for code in create_data])
+
+    return {
+        'assigned': len(create_data),
+        'unmatched_pages': [number + 1 for number in unmatched if first <= number < last]
+    }
+
+
+def wb_page_sku(page):
+    """(color, size, code) страницы Wildberries по позициям строк текста."""
+    text = page.get_text("text")
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+    size_index = 6
+    code_start_index = 7
+    color_index = 9
+
+    size = lines[size_index] if len(lines) > size_index else ""
+    code_lines = lines[code_start_index:code_start_index + 2] if len(lines) > code_start_index + 1 else []
+    code = "".join(code_lines).replace(" ", "")
+    color = lines[color_index] if len(lines) > color_index else ""
+    return color, size, code
+
+
+def import_wb_codes(pdf_bytes, order_id, title, progress=None):
+    """
+    Коды Wildberries: размер, цвет и код читаются из текста страницы.
+    Этикетка одна на SKU - общая для всех его изделий; если SKU встречается
+    на нескольких страницах, берется первая.
+    """
+    pdf_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+    sku_pages = {}
+    for number, page in enumerate(pdf_doc):
+        color, size, code = wb_page_sku(page)
+        sku_pages.setdefault((color, size), (number, code))
+
+    products = products_by_sku(order_id, title, list(sku_pages))
+    found = [(sku, number, code) for sku, (number, code) in sku_pages.items() if products.get(sku)]
+
+    images = iter_render_pages(
+        pdf_bytes,
+        [number for _, number, _ in found],
+        **label_render_options()
+    )
+
+    create_data = []
+    for done, ((sku, _, code), image) in enumerate(zip(found, images), start=1):
+        label = store_label(image)
+        for product in products[sku]:
+            create_data.append(
+                ProductCode(
+                    product=product,
+                    code=code,
+                    type=CodeType.WB,
+                    file=label
+                )
+            )
+
+        if progress:
+            progress(done, len(found))
+
+    with transaction.atomic():
+        ProductCode.objects.filter(
+            product__in=[product for sku, _, _ in found for product in products[sku]],
+            type=CodeType.WB
+        ).delete()
+        ProductCode.objects.bulk_create(create_data, batch_size=1000)
+        bump_versions(ProductCode, [code.product_id for code in create_data])
+
+    return {
+        'assigned': len(create_data)
+    }
+
+
+def claimable():
+    """
+    Новые задачи и зависшие RUNNING: обработчик, который давно не обновлял
+    прогресс, считается упавшим (перезапуск процесса, OOM).
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.PDF_IMPORT_STALE_AFTER)
+    return Q(status=JobStatus.NEW) | Q(status=JobStatus.RUNNING, updated_at__lt=stale_before)
+
+
+def claim_job(job_id):
+    """Переводит задачу в RUNNING; False, если ее уже забрал другой обработчик."""
+    return bool(
+        PDFImportJob.objects
+        .filter(claimable(), id=job_id)
+        .update(
+            status=JobStatus.RUNNING,
+            pages_done=0,
+            started_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+    )
+
+
+def claim_next_job():
+    job_ids = (
+        PDFImportJob.objects
+        .filter(claimable())
+        .order_by('created_at')
+        .values_list('id', flat=True)[:10]
+    )
+    for job_id in job_ids:
+        if claim_job(job_id):
+            return PDFImportJob.objects.get(id=job_id)
+    return None
+
+
+def run_job(job):
+    def progress(done, total):
+        if done == total or done % PROGRESS_STEP == 0:
+            PDFImportJob.objects.filter(id=job.id).update(
+                pages_done=done,
+                pages_total=total,
+                updated_at=timezone.now()
+            )
+
+    try:
+        with job.file.open('rb') as f:
+            pdf_bytes = f.read()
+
+        if job.type == CodeType.HS:
+            result = import_hs_codes(
+                pdf_bytes,
+                job.order_id,
+                job.product_title,
+                job.color,
+                job.size,
+                job.first_page,
+                job.last_page,
+                progress=progress
+            )
+        else:
+            result = import_wb_codes(
+                pdf_bytes,
+                job.order_id,
+                job.product_title,
+                progress=progress
+            )
+    except Exception as e:
+        PDFImportJob.objects.filter(id=job.id).update(
+            status=JobStatus.FAILED,
+            error=str(e),
+            finished_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        return False
+
+    PDFImportJob.objects.filter(id=job.id).update(
+        status=JobStatus.DONE,
+        result=result,
+        finished_at=timezone.now(),
+        updated_at=timezone.now()
+    )
+    job.file.delete(save=False)
+    return True
+
+
+def _run_jobs_thread(job_id=None):
+    try:
+        if job_id is not None and claim_job(job_id):
+            run_job(PDFImportJob.objects.get(id=job_id))
+
+        # задачи, брошенные перезапущенными воркерами
+        job = claim_next_job()
+        while job:
+            run_job(job)
+            job = claim_next_job()
+    finally:
+        connection.close()
+
+
+def enqueue_job(job):
+    """
+    В режиме PDF_IMPORT_WORKER='thread' задача сразу запускается в потоке
+    веб-процесса, в режиме 'command' ее забирает manage.py pdf_import_worker.
+    Поток после своей задачи дорабатывает зависшие (см. claimable).
+    """
+    if settings.PDF_IMPORT_WORKER == 'thread':
+        transaction.on_commit(
+            lambda: threading.Thread(target=_run_jobs_thread, args=(job.id,), daemon=True).start()
+        )
+
+
+def resume_jobs():
+    """
+    Запуск воркера в режиме 'thread': подбирает задачи, оставшиеся после
+    перезапуска процессов, - опрашивать очередь здесь больше некому.
+    """
+    if settings.PDF_IMPORT_WORKER == 'thread':
+        threading.Thread(target=_run_jobs_thread, daemon=True).start()
+
+
+def work_forever(sleep=2, once=False):
+    while True:
+        job = claim_next_job()
+        if job:
+            run_job(job)
+            continue
+        if once:
+            return
+        time.sleep(sleep)
@@ -0,0 +1,131 @@
+from collections import Counter
+
+from django.db import transaction
+
+from api.serializers.receiver import BulkReceptionRowSerializer
+from api.services import workflow
+from api.services.order_progress import apply_progress, track_transition, transition_deltas
+from db.enums import CodeType
+from db.models import Product, ProductCode, Work
+
+
+def receive_product(order_id, title, color, size, internal_code, file, staff_id):
+    """Принимает одно изделие: Product, внутренний код и работа приемщика."""
+    with transaction.atomic():
+        product = Product.objects.create(
+            order_id=order_id,
+            title=title,
+            color=color,
+            size=size,
+            internal_code=internal_code,
+            status=workflow.INITIAL
+        )
+
+        ProductCode.objects.create(
+            product=product,
+            file=file,
+            code=internal_code,
+            type=CodeType.INTERNAL
+        )
+
+        work = Work.objects.create(
+            product=product,
+            staff_id=staff_id,
+            status=workflow.INITIAL,
+        )
+
+        track_transition(product, None, added=[(work.status, work.staff_id)])
+
+    return product
+
+
+def receive_bulk(order, manifest, files, staff_id):
+    """
+    Принимает пачку изделий заказа.
+
+    manifest - список строк BulkReceptionRow, files - загруженные файлы кодов.
+    Файлы пишутся в хранилище по частям во время bulk_create.
+    Возвращает количество созданных изделий и ошибки по строкам.
+    """
+    errors = []
+    products = []
+    codes = []
+    works = []
+    deltas = Counter()
+    seen = set()
+    existing = set(
+        Product.objects
+        .filter(internal_code__in=[
+            row.get('internal_code') for row in manifest if isinstance(row, dict)
+        ])
+        .values_list('internal_code', flat=True)
+    )
+
+    for index, row in enumerate(manifest):
+        serializer = BulkReceptionRowSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({
+                'row': index,
+                'internal_code': row.get('internal_code') if isinstance(row, dict) else None,
+                'errors': serializer.errors
+            })
+            continue
+
+        validated = serializer.validated_data
+        internal_code = validated['internal_code']
+        file = files.get(validated.get('file', internal_code))
+
+        row_errors = {}
+        if file is None:
+            row_errors['file'] = ['Файл не найден']
+        if internal_code in seen:
+            row_errors['internal_code'] = ['Код повторяется в манифесте']
+        elif internal_code in existing:
+            row_errors['internal_code'] = ['Изделие с таким кодом уже принято']
+        if row_errors:
+            errors.append({'row': index, 'internal_code': internal_code, 'errors': row_errors})
+            continue
+        seen.add(internal_code)
+
+        product = Product(
+            order=order,
+            title=validated['title'],
+            color=validated['color'],
+            size=validated['size'],
+            internal_code=internal_code,
+            status=workflow.INITIAL
+        )
+        products.append(product)
+        codes.append(
+            ProductCode(
+                product=product,
+                file=file,
+                code=internal_code,
+                type=CodeType.INTERNAL
+            )
+        )
+        works.append(
+            Work(
+                product=product,
+                staff_id=staff_id,
+                status=workflow.INITIAL
+            )
+        )
+        transition_deltas(
+            product,
+            None,
+            added=[(workflow.INITIAL, staff_id)],
+            deltas=deltas
+        )
+
+    if products:
+        with transaction.atomic():
+            Product.objects.bulk_create(products, batch_size=500)
+            ProductCode.objects.bulk_create(codes, batch_size=500)
+            Work.objects.bulk_create(works, batch_size=500)
+            apply_progress(deltas)
+
+    return {
+        'created': len(products),
+        'errors': errors
+    }
@@ -0,0 +1,186 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.core.cache import caches
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from db.enums import ProductStatus, StatementType
+from db.models import StaffProfile, Statement, Work
+
+BUCKETS = {
+    'hour': (TruncHour, timedelta(hours=1)),
+    'day': (TruncDay, timedelta(days=1)),
+}
+
+# закрытые интервалы почти не меняются (откат маркировки удаляет работы),
+# поэтому кэшируются на сутки, а не навсегда
+CLOSED_BUCKET_TIMEOUT = 60 * 60 * 24
+
+# одобренная перепечатка удаляет работу маркировки, а одобренные и
+# отклоненные заявки в базе не различаются, поэтому точного знаменателя нет
+REPRINT_RATE_BASIS = (
+    'заявки на перепечатку / сохранившиеся работы маркировки; '
+    'одобренная перепечатка удаляет работу маркировки, поэтому значение может быть завышено'
+)
+
+
+def bucket_starts(date_from, date_to, step):
+    current = datetime.combine(date_from, time.min)
+    end = datetime.combine(date_to + timedelta(days=1), time.min)
+    while current < end:
+        yield timezone.make_aware(current)
+        current += step
+
+
+def bucket_cache_key(bucket, start, order_id):
+    return f'report:productivity:{bucket}:{start.isoformat()}:{order_id or "all"}'
+
+
+def compute_buckets(starts, bucket, order_id=None):
+    """
+    Агрегаты по интервалам starts двумя GROUP BY:
+    работы по (интервал, сотрудник, статус) и заявки на перепечатку по (интервал, сотрудник).
+    """
+    trunc, step = BUCKETS[bucket]
+    result = {start: {'works': [], 'statements': []} for start in starts}
+
+    works = Work.objects.filter(
+        created_at__gte=min(starts),
+        created_at__lt=max(starts) + step
+    )
+    statements = Statement.objects.filter(
+        type=StatementType.CODE,
+        created_at__gte=min(starts),
+        created_at__lt=max(starts) + step
+    )
+    if order_id:
+        works = works.filter(product__order_id=order_id)
+        statements = statements.filter(product__order_id=order_id)
+
+    work_rows = (
+        works
+        .annotate(bucket=trunc('created_at'))
+        .values('bucket', 'staff_id', 'status')
+        .annotate(amount=Count('id'))
+        .order_by()
+    )
+    for row in work_rows:
+        if row['bucket'] in result:
+            result[row['bucket']]['works'].append((row['staff_id'], row['status'], row['amount']))
+
+    statement_rows = (
+        statements
+        .annotate(bucket=trunc('created_at'))
+        .values('bucket', 'staff_id')
+        .annotate(amount=Count('id'))
+        .order_by()
+    )
+    for row in statement_rows:
+        if row['bucket'] in result:
+            result[row['bucket']]['statements'].append((row['staff_id'], row['amount']))
+
+    return result
+
+
+def collect_buckets(date_from, date_to, bucket, order_id=None):
+    """Закрытые интервалы берутся из кэша, текущий считается заново."""
+    _, step = BUCKETS[bucket]
+    now = timezone.now()
+
+    starts = [start for start in bucket_starts(date_from, date_to, step) if start <= now]
+    closed = [start for start in starts if start + step <= now]
+    current = [start for start in starts if start + step > now]
+
+    keys = {start: bucket_cache_key(bucket, start, order_id) for start in closed}
+    cache = caches['reports']
+    cached = cache.get_many(keys.values())
+
+    data = {}
+    missing = []
+    for start in closed:
+        if keys[start] in cached:
+            data[start] = cached[keys[start]]
+        else:
+            missing.append(start)
+
+    if missing:
+        computed = compute_buckets(missing, bucket, order_id)
+        cache.set_many({keys[start]: computed[start] for start in missing}, CLOSED_BUCKET_TIMEOUT)
+        data.update(computed)
+
+    if current:
+        data.update(compute_buckets(current, bucket, order_id))
+
+    return [(start, data[start]) for start in starts]
+
+
+def _rate(part, total):
+    return round(part / total, 4) if total else None
+
+
+def productivity_report(date_from, date_to, bucket='day', order_id=None):
+    buckets = collect_buckets(date_from, date_to, bucket, order_id)
+
+    staff_works = defaultdict(lambda: defaultdict(int))
+    staff_statements = defaultdict(int)
+    for _, values in buckets:
+        for staff_id, status, amount in values['works']:
+            staff_works[staff_id][status] += amount
+        for staff_id, amount in values['statements']:
+            staff_statements[staff_id] += amount
+
+    profiles = {
+        profile_id: (fullname, role)
+        for profile_id, fullname, role in StaffProfile.objects.filter(
+            id__in=set(staff_works) | set(staff_statements)
+        ).values_list('id', 'fullname', 'role')
+    }
+
+    def fullname(staff_id):
+        return profiles.get(staff_id, (None, None))[0]
+
+    staff = []
+    for staff_id in set(staff_works) | set(staff_statements):
+        works = staff_works.get(staff_id, {})
+        defects = works.get(ProductStatus.DEFECT, 0)
+        checked = works.get(ProductStatus.OTK, 0) + defects
+        staff.append({
+            'staff': staff_id,
+            'fullname': fullname(staff_id),
+            'role': profiles.get(staff_id, (None, None))[1],
+            'works': {ProductStatus(status).name: amount for status, amount in works.items()},
+            'defect_rate': _rate(defects, checked),
+            'reprint_rate': _rate(staff_statements.get(staff_id, 0), works.get(ProductStatus.MARKER, 0)),
+        })
+    staff.sort(key=lambda item: (item['fullname'] or '', str(item['staff'])))
+
+    return {
+        'bucket': bucket,
+        'reprint_rate_basis': REPRINT_RATE_BASIS,
+        'buckets': [
+            {
+                'start': start,
+                'works': [
+                    {
+                        'staff': staff_id,
+                        'fullname': fullname(staff_id),
+                        'status': status,
+                        'amount': amount
+                    }
+                    for staff_id, status, amount in values['works']
+                ],
+                'statements': [
+                    {
+                        'staff': staff_id,
+                        'fullname': fullname(staff_id),
+                        'amount': amount
+                    }
+                    for staff_id, amount in values['statements']
+                ]
+            }
+            for start, values in buckets
+        ],
+        'staff': staff
+    }
@@ -0,0 +1,42 @@
+from db.enums import CodeType
+from db.models import Product, ProductCode
+
+
+async def aget_product_by_internal_code(internal_code, queryset=None):
+    """Изделие по текущему коду сканирования (индекс по Product.internal_code)."""
+    if queryset is None:
+        queryset = Product.objects.all()
+    return await queryset.filter(internal_code=internal_code).afirst()
+
+
+def _resolve_queryset(code, types=None, queryset=None):
+    if queryset is None:
+        queryset = Product.objects.all()
+    if types is None:
+        types = CodeType.values
+
+    branches = []
+    if CodeType.INTERNAL in types:
+        branches.append(
+            Product.objects.filter(internal_code=code).order_by().values('id')
+        )
+        branches.append(
+            Product.objects.filter(old_internal_code=code).order_by().values('id')
+        )
+    branches.append(
+        ProductCode.objects.filter(code=code, type__in=types).order_by().values('product_id')
+    )
+
+    ids = branches[0].union(*branches[1:]) if len(branches) > 1 else branches[0]
+    return queryset.filter(id__in=ids)
+
+
+async def aresolve_product(code, types=None, queryset=None):
+    """
+    Изделие по коду любого типа одним запросом.
+
+    INTERNAL ищется по Product.internal_code и Product.old_internal_code,
+    остальные типы - по ProductCode.code. Каждая ветка UNION идет по своему
+    индексу. types=None - все типы CodeType.
+    """
+    return await _resolve_queryset(code, types, queryset).afirst()
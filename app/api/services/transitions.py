@@ -0,0 +1,83 @@
+from django.db import transaction
+from django.utils import timezone
+
+from api.services import workflow
+from api.services.order_progress import track_transition
+from db.enums import CodeType
+from db.models import Product, ProductCode, Work, WorkImage
+
+
+def hs_code(product_id):
+    return (
+        ProductCode.objects
+        .filter(product_id=product_id, type=CodeType.HS)
+        .values_list('code', flat=True)
+        .first()
+    )
+
+
+def swap_code(product, mode, hs=None):
+    """Замена кода сканирования по Transition.code. Возвращает измененные поля."""
+    if mode == workflow.CODE_TO_HS:
+        product.old_internal_code = product.internal_code
+        product.internal_code = hs or product.internal_code
+        return ['internal_code', 'old_internal_code']
+    if mode == workflow.CODE_RESTORE and product.old_internal_code:
+        product.internal_code = product.old_internal_code
+        return ['internal_code']
+    return []
+
+
+def apply_transition(product, name, staff_id=None, comment=None, images=()):
+    """
+    Проводит изделие по переходу workflow.TRANSITIONS[name] под блокировкой строки.
+
+    Статус перечитывается через SELECT ... FOR UPDATE, поэтому при
+    одновременном сканировании проходит только один запрос. Изделие
+    сохраняется с update_fields, работа, фото и счетчики пишутся в той же
+    транзакции. Возвращает изделие или None, если переход запрещен.
+    """
+    transition = workflow.TRANSITIONS[name]
+
+    with transaction.atomic():
+        locked = Product.objects.select_for_update().filter(id=product.id).first()
+        if not locked or not workflow.can_apply(locked.status, name):
+            return None
+
+        old_status = locked.status
+        locked.status = transition.target
+        locked.updated_at = timezone.now()
+
+        fields = ['status', 'updated_at']
+        if transition.code:
+            fields += swap_code(
+                locked,
+                transition.code,
+                hs_code(locked.id) if transition.code == workflow.CODE_TO_HS else None
+            )
+        locked.save(update_fields=fields)
+
+        removed = []
+        if transition.rollback:
+            works = Work.objects.filter(product=locked, status__in=transition.rollback)
+            removed = list(works.values_list('status', 'staff_id'))
+            works.delete()
+
+        added = []
+        if transition.work:
+            work = Work.objects.create(
+                product=locked,
+                staff_id=staff_id,
+                status=transition.target,
+                comment=comment
+            )
+            added.append((work.status, work.staff_id))
+
+            if transition.images:
+                WorkImage.objects.bulk_create(
+                    WorkImage(work=work, image=image) for image in images if image
+                )
+
+        track_transition(locked, old_status, added=added, removed=removed)
+
+    return locked
@@ -0,0 +1,81 @@
+from collections import namedtuple
+
+from db.enums import ProductStatus
+
+# Маршрут изделия по участкам. Все переходы статусов описаны здесь,
+# одиночные сканирования, пачки и модерация заявок только исполняют их.
+
+# замена кода сканирования
+CODE_TO_HS = 'to_hs'          # internal_code -> код ЧЗ, прежний в old_internal_code
+CODE_RESTORE = 'restore'      # возврат internal_code из old_internal_code
+
+Transition = namedtuple(
+    'Transition',
+    [
+        'sources',      # статусы, из которых разрешен переход
+        'target',       # новый статус
+        'work',         # создать Work со статусом target
+        'images',       # к работе прикладываются фото
+        'code',         # CODE_TO_HS / CODE_RESTORE / None
+        'rollback',     # статусы работ, удаляемых при переходе
+    ]
+)
+
+INITIAL = ProductStatus.RECEIVER
+
+OTK = 'otk'
+DEFECT = 'defect'
+PACKER = 'packer'
+MARKER = 'marker'
+REPRINT = 'reprint'
+
+TRANSITIONS = {
+    OTK: Transition(
+        sources=(ProductStatus.RECEIVER,),
+        target=ProductStatus.OTK,
+        work=True, images=False, code=None, rollback=()
+    ),
+    DEFECT: Transition(
+        sources=(ProductStatus.RECEIVER,),
+        target=ProductStatus.DEFECT,
+        work=True, images=True, code=None, rollback=()
+    ),
+    PACKER: Transition(
+        sources=(ProductStatus.RECEIVER, ProductStatus.OTK),
+        target=ProductStatus.PACKER,
+        work=True, images=False, code=None, rollback=()
+    ),
+    MARKER: Transition(
+        sources=(ProductStatus.RECEIVER, ProductStatus.PACKER),
+        target=ProductStatus.MARKER,
+        work=True, images=False, code=CODE_TO_HS, rollback=()
+    ),
+    # одобренная заявка на перепечатку возвращает изделие на маркировку
+    REPRINT: Transition(
+        sources=(ProductStatus.MARKER,),
+        target=ProductStatus.PACKER,
+        work=False, images=False, code=CODE_RESTORE, rollback=(ProductStatus.MARKER,)
+    ),
+}
+
+# таблицы, собранные один раз при импорте
+SOURCES = {name: frozenset(transition.sources) for name, transition in TRANSITIONS.items()}
+MOVES = {
+    (source, name): transition.target
+    for name, transition in TRANSITIONS.items()
+    for source in transition.sources
+}
+
+
+def can_apply(status, name):
+    return (status, name) in MOVES
+
+
+def split_allowed(name, statuses):
+    """
+    Разбивает {ключ: статус} на разрешенные и запрещенные для перехода ключи
+    одной операцией над множествами.
+    """
+    sources = SOURCES[name]
+    allowed = {key for key, status in statuses.items() if status in sources}
+    return allowed, statuses.keys() - allowed
@@ -0,0 +1,299 @@
+import random
+import threading
+import uuid
+from collections import Counter
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.services import workflow
+from api.services.batch import OK, process_batch
+from api.services.order_progress import apply_progress, count_progress, track_transition
+from api.services.transitions import apply_transition
+from db.enums import OrderStatus, ProductStatus, StaffRole, UserStatus
+from db.models import ClientProfile, MyUser, Order, OrderProduct, OrderProgress, Product, ProductCode, ProductDetail, \
+    StaffProfile, Work
+
+
+class OrderDetailViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = MyUser.objects.create_user(username='director', password='p', status=UserStatus.STAFF)
+        StaffProfile.objects.create(user=user, fullname='director', role=StaffRole.DIRECTOR)
+        cls.user = user
+
+        client_user = MyUser.objects.create_user(username='client', password='p', status=UserStatus.CLIENT)
+        client = ClientProfile.objects.create(user=client_user, fullname='client')
+        cls.order = Order.objects.create(client=client, status=OrderStatus.PROGRES)
+
+        staff = []
+        for index, role in enumerate([StaffRole.RECEIVER, StaffRole.OTK, StaffRole.PACKER]):
+            staff_user = MyUser.objects.create_user(username=f'staff{index}', password='p', status=UserStatus.STAFF)
+            staff.append(StaffProfile.objects.create(user=staff_user, fullname=f'staff{index}', role=role))
+
+        for title in ['A', 'B']:
+            order_product = OrderProduct.objects.create(order=cls.order, product_title=title)
+            for color, size in [('red', 'M'), ('blue', 'L')]:
+                ProductDetail.objects.create(order_product=order_product, color=color, size=size, amount=10)
+
+                for index in range(3):
+                    product = Product.objects.create(
+                        order=cls.order,
+                        title=title,
+                        color=color,
+                        size=size,
+                        internal_code=f'{title}-{color}-{size}-{index}',
+                        status=ProductStatus.RECEIVER
+                    )
+                    work = Work.objects.create(product=product, staff=staff[0], status=ProductStatus.RECEIVER)
+                    track_transition(product, None, added=[(work.status, work.staff_id)])
+
+                    if index:
+                        product.status = ProductStatus.OTK
+                        product.save()
+                        work = Work.objects.create(product=product, staff=staff[1], status=ProductStatus.OTK)
+                        track_transition(product, ProductStatus.RECEIVER, added=[(work.status, work.staff_id)])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_query_count_does_not_depend_on_order_size(self):
+        # валидаторы условного GET, заказ, товары заказа, детали, счетчики OrderProgress
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/v1/director/order/', {'order_id': str(self.order.id)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary']['RECEIVER'], 4)
+        self.assertEqual(response.data['summary']['OTK'], 8)
+
+    def test_not_modified(self):
+        response = self.client.get('/api/v1/director/order/', {'order_id': str(self.order.id)})
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/api/v1/director/order/',
+                {'order_id': str(self.order.id)},
+                HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_staff_rename_changes_etag(self):
+        response = self.client.get('/api/v1/director/order/', {'order_id': str(self.order.id)})
+
+        staff = StaffProfile.objects.get(fullname='staff1')
+        staff.fullname = 'renamed'
+        staff.save()
+
+        response = self.client.get(
+            '/api/v1/director/order/',
+            {'order_id': str(self.order.id)},
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('renamed', str(response.data['info']))
+
+
+class StaffRoleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = MyUser.objects.create_user(username='director', password='p', status=UserStatus.STAFF)
+        self.profile = StaffProfile.objects.create(user=user, fullname='director', role=StaffRole.DIRECTOR)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_role_change_outside_api_revokes_access(self):
+        self.assertEqual(self.client.get('/api/v1/director/cache/stats/').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.role = StaffRole.OTK
+            self.profile.save()
+
+        self.assertEqual(self.client.get('/api/v1/director/cache/stats/').status_code, 403)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'планы запросов Postgres')
+class IndexUsageTests(TestCase):
+    """Запросы списков и сканирования идут по индексам из Meta.indexes."""
+
+    def setUp(self):
+        # на пустых таблицах планировщик выбрал бы Seq Scan
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index):
+        self.assertIn(index, queryset.explain())
+
+    def test_order_keyset_list(self):
+        created_at, pk = timezone.now(), uuid.uuid4()
+        queryset = Order.objects.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        ).order_by('-created_at', '-id')[:20]
+        self.assertUsesIndex(queryset, 'order_created_idx')
+
+    def test_order_status_list(self):
+        queryset = Order.objects.filter(status=OrderStatus.PROGRES).order_by('-created_at', '-id')[:20]
+        self.assertUsesIndex(queryset, 'order_status_created_idx')
+
+    def test_product_status_filter(self):
+        self.assertUsesIndex(Product.objects.filter(status=ProductStatus.OTK), 'product_status_idx')
+
+    def test_scan_lookups(self):
+        self.assertUsesIndex(Product.objects.filter(internal_code='code'), 'product_internal_code_idx')
+        self.assertUsesIndex(Product.objects.filter(old_internal_code='code'), 'product_old_internal_code_idx')
+        self.assertUsesIndex(ProductCode.objects.filter(code='code'), 'product_code_code_idx')
+
+    def test_product_foreign_keys(self):
+        product_id = uuid.uuid4()
+        self.assertUsesIndex(Work.objects.filter(product_id=product_id), 'work_product_status_idx')
+        self.assertUsesIndex(ProductCode.objects.filter(product_id=product_id), 'product_code_type_idx')
+        self.assertUsesIndex(Product.objects.filter(order_id=product_id), 'product_sku_idx')
+
+
+class ApplyProgressTests(TransactionTestCase):
+    def setUp(self):
+        client_user = MyUser.objects.create_user(username='client', password='p', status=UserStatus.CLIENT)
+        client = ClientProfile.objects.create(user=client_user, fullname='client')
+        self.order = Order.objects.create(client=client, status=OrderStatus.PROGRES)
+
+        staff_user = MyUser.objects.create_user(username='marker', password='p', status=UserStatus.STAFF)
+        self.staff = StaffProfile.objects.create(user=staff_user, fullname='marker', role=StaffRole.MARKER)
+
+        self.keys = [
+            (self.order.id, 'A', 'red', 'M', ProductStatus.PACKER, None),
+            (self.order.id, 'A', 'red', 'M', ProductStatus.MARKER, None),
+            (self.order.id, 'A', 'red', 'M', ProductStatus.MARKER, self.staff.id),
+        ]
+        apply_progress(Counter({key: 100 for key in self.keys}))
+
+    def test_rows_are_updated_in_fixed_order(self):
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            if sql.startswith('UPDATE'):
+                # без amount и updated_at - только ключ строки
+                statements.append(tuple(params[2:]))
+            return execute(sql, params, many, context)
+
+        for keys in [self.keys, self.keys[::-1]]:
+            with connection.execute_wrapper(capture):
+                apply_progress(Counter({key: 1 for key in keys}))
+
+        self.assertEqual(statements[:3], statements[3:])
+
+    @skipUnless(connection.vendor == 'postgresql', 'нужны блокировки строк Postgres')
+    def test_opposite_order_deltas_do_not_deadlock(self):
+        errors = []
+
+        def run(keys):
+            try:
+                for _ in range(50):
+                    with transaction.atomic():
+                        apply_progress(Counter({key: 1 for key in keys}))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=run, args=(self.keys,)),
+            threading.Thread(target=run, args=(self.keys[::-1],)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            sorted(OrderProgress.objects.filter(order=self.order).values_list('amount', flat=True)),
+            [200, 200, 200]
+        )
+
+
+@skipUnless(connection.vendor == 'postgresql', 'нужны блокировки строк Postgres')
+class ConcurrentTransitionTests(TransactionTestCase):
+    def setUp(self):
+        client_user = MyUser.objects.create_user(username='client', password='p', status=UserStatus.CLIENT)
+        client = ClientProfile.objects.create(user=client_user, fullname='client')
+        self.order = Order.objects.create(client=client, status=OrderStatus.PROGRES)
+
+        self.staff = []
+        for index in range(4):
+            staff_user = MyUser.objects.create_user(username=f'otk{index}', password='p', status=UserStatus.STAFF)
+            self.staff.append(StaffProfile.objects.create(user=staff_user, fullname=f'otk{index}', role=StaffRole.OTK))
+
+        self.products = []
+        for index in range(30):
+            product = Product.objects.create(
+                order=self.order,
+                title='A',
+                color='red',
+                size='M',
+                internal_code=f'code-{index}',
+                status=ProductStatus.RECEIVER
+            )
+            track_transition(product, None)
+            self.products.append(product)
+
+    def run_parallel(self, targets):
+        barrier = threading.Barrier(len(targets))
+        errors = []
+
+        def run(target):
+            try:
+                barrier.wait()
+                target()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+    def test_exactly_one_success_per_item(self):
+        successes = Counter()
+        lock = threading.Lock()
+
+        def single(staff):
+            def target():
+                for product in random.sample(self.products, len(self.products)):
+                    if apply_transition(product, workflow.OTK, staff_id=staff.id):
+                        with lock:
+                            successes[product.internal_code] += 1
+            return target
+
+        def batch(staff):
+            def target():
+                codes = [product.internal_code for product in random.sample(self.products, len(self.products))]
+                for result in process_batch(codes, staff.id, workflow.OTK):
+                    if result['result'] == OK:
+                        with lock:
+                            successes[result['internal_code']] += 1
+            return target
+
+        self.run_parallel([single(self.staff[0]), single(self.staff[1]), batch(self.staff[2]), batch(self.staff[3])])
+
+        self.assertEqual(successes, Counter({product.internal_code: 1 for product in self.products}))
+        self.assertEqual(
+            Work.objects.filter(product__order=self.order, status=ProductStatus.OTK).count(),
+            len(self.products)
+        )
+        self.assertFalse(Product.objects.filter(order=self.order).exclude(status=ProductStatus.OTK).exists())
+
+        progress = Counter({
+            (row.order_id, row.title, row.color, row.size, row.status, row.staff_id): row.amount
+            for row in OrderProgress.objects.filter(order=self.order).exclude(amount=0)
+        })
+        self.assertEqual(progress, count_progress([self.order]))
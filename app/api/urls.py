@@ -7,9 +7,11 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from api.views.director import ClientModelViewSet, StaffModelViewSet, OrderModelViewSet, OrderReadViewSet, \
-    StatementListView, UpdateStatementView, OrderDetailView, PDFHSCodeView, PDFExtractView
-from api.views.work import OTKWorkView, PackerWorkView, MarkerImagesView, MarkerWorkView, CreateStatementView
-from api.views.receiver import OrderListView, ReceptionView
+    StatementListView, UpdateStatementView, OrderDetailView, PDFHSCodeView, PDFExtractView, PDFImportJobView, \
+    ExportView, ProductivityReportView, CacheStatsView
+from api.views.work import OTKWorkView, PackerWorkView, MarkerImagesView, MarkerWorkView, CreateStatementView, \
+    OTKBatchWorkView, PackerBatchWorkView, MarkerBatchWorkView
+from api.views.receiver import OrderListView, ReceptionView, BulkReceptionView
 
 router = DefaultRouter()
 router.register('director/client/crud', ClientModelViewSet)
@@ -31,10 +33,14 @@ urlpatterns = [
 
         path('receiver/order/list/', OrderListView.as_view()),
         path('receiver/reception/', ReceptionView.as_view()),
+        path('receiver/reception/bulk/', BulkReceptionView.as_view()),
 
         path('otk/work/', OTKWorkView.as_view()),
+        path('otk/work/batch/', OTKBatchWorkView.as_view()),
         path('packer/work/', PackerWorkView.as_view()),
+        path('packer/work/batch/', PackerBatchWorkView.as_view()),
         path('marker/work/', MarkerWorkView.as_view()),
+        path('marker/work/batch/', MarkerBatchWorkView.as_view()),
         path('marker/work/get/images/', MarkerImagesView.as_view()),
         path('marker/create/statement/', CreateStatementView.as_view()),
 
@@ -43,6 +49,10 @@ urlpatterns = [
         path('director/order/', OrderDetailView.as_view()),
         path('director/pdf/hs-code/', PDFHSCodeView.as_view()),
         path('director/pdf/wb-code/', PDFExtractView.as_view()),
+        path('director/pdf/job/', PDFImportJobView.as_view()),
+        path('director/export/', ExportView.as_view()),
+        path('director/report/productivity/', ProductivityReportView.as_view()),
+        path('director/cache/stats/', CacheStatsView.as_view()),
 
 
 
@@ -1,8 +1,5 @@
-import io
-
-from PIL import Image
-from django.core.files.base import ContentFile
-from django.db.models import Count
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets, status, mixins
 from rest_framework.generics import ListAPIView
@@ -10,20 +7,33 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
-import fitz
 
-from api.permissions import IsDirector
+from api.authentication import revoke_user
+from api.cache import CachedResponseMixin, cache_stats
+from api.conditional import conditional_response, order_list_validators, order_validators, \
+    statement_list_validators
+from api.permissions import IsDirector, get_staff_profile_id
 from api.serializers.director import ClientSerializer, ClientCreateSerializer, ClientUpdateSerializer, \
     MyUserCreateSerializer, MyUserUpdateSerializer, StaffSerializer, StaffCreateSerializer, StaffUpdateSerializer, \
-    OrderSerializer, OrderCreateUpdateSerializer, StatementSerializer, StatementUpdateSerializer
-
-from db.enums import UserStatus, StatementType, ProductStatus, CodeType
-from db.models import ClientProfile, MyUser, StaffProfile, Order, Statement, Product, Work, ProductCode
-
-
-class ClientModelViewSet(viewsets.ModelViewSet):
+    OrderSerializer, OrderCreateUpdateSerializer, StatementSerializer, StatementUpdateSerializer, \
+    PDFImportSerializer, PDFImportJobSerializer, PDFImportJobCreatedSerializer, PDFImportJobQuerySerializer, \
+    ExportSerializer, ProductivityReportSerializer
+from api.serializers.fast import DIRECTOR_ORDER_FIELDS, order_values, serialize_orders
+from api.services import workflow
+from api.services.export import EXPORTS, csv_stream, ndjson_stream
+from api.services.order_progress import get_order_progress
+from api.services.pdf_import import enqueue_job
+from api.services.reports import productivity_report
+from api.services.transitions import apply_transition
+
+from db.enums import UserStatus, StatementType, CodeType
+from db.models import ClientProfile, MyUser, StaffProfile, Order, Statement, PDFImportJob
+
+
+class ClientModelViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsDirector]
     queryset = ClientProfile.objects.all()
+    cache_models = (ClientProfile, MyUser)
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -33,6 +43,12 @@ class ClientModelViewSet(viewsets.ModelViewSet):
         else:
             return ClientUpdateSerializer
 
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(ClientModelViewSet, self).list(request, *args, **kwargs)
+        )
+
     @extend_schema(
         request=ClientCreateSerializer,
         responses=ClientSerializer
@@ -111,12 +127,14 @@ class ClientModelViewSet(viewsets.ModelViewSet):
         user = client_profile.user
         user.is_active = False
         user.save()
+        revoke_user(user.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class StaffModelViewSet(viewsets.ModelViewSet):
+class StaffModelViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsDirector]
     queryset = StaffProfile.objects.all()
+    cache_models = (StaffProfile, MyUser)
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -126,6 +144,12 @@ class StaffModelViewSet(viewsets.ModelViewSet):
         else:
             return StaffUpdateSerializer
 
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(StaffModelViewSet, self).list(request, *args, **kwargs)
+        )
+
     @extend_schema(
         request=StaffCreateSerializer,
         responses=StaffSerializer
@@ -204,6 +228,7 @@ class StaffModelViewSet(viewsets.ModelViewSet):
         user = staff_profile.user
         user.is_active = False
         user.save()
+        revoke_user(user.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -222,6 +247,26 @@ class OrderReadViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Order.objects.select_related('client').prefetch_related('order_products__details')
     serializer_class = OrderSerializer
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(Order.objects.all())
+
+        def build():
+            rows = self.paginate_queryset(order_values(queryset))
+            return self.get_paginated_response(serialize_orders(rows, DIRECTOR_ORDER_FIELDS))
+
+        return conditional_response(request, build, *order_list_validators(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = order_validators(kwargs[self.lookup_field])
+        if validators is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        return conditional_response(
+            request,
+            lambda: super(OrderReadViewSet, self).retrieve(request, *args, **kwargs),
+            *validators
+        )
+
 
 class StatementListView(ListAPIView):
     permission_classes = [IsAuthenticated, ]
@@ -231,6 +276,13 @@ class StatementListView(ListAPIView):
     ).select_related('product', 'staff')
     serializer_class = StatementSerializer
 
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request,
+            lambda: super(StatementListView, self).list(request, *args, **kwargs),
+            *statement_list_validators(self.filter_queryset(self.get_queryset()))
+        )
+
 
 class UpdateStatementView(APIView):
     permission_classes = [IsAuthenticated, IsDirector]
@@ -248,21 +300,12 @@ class UpdateStatementView(APIView):
         ).first()
 
         if statement:
-            if validated.get('is_success'):
-                product = statement.product
-
-                Work.objects.filter(
-                    product=product,
-                    status=ProductStatus.MARKER
-
-                ).delete()
+            with transaction.atomic():
+                if validated.get('is_success'):
+                    apply_transition(statement.product, workflow.REPRINT)
 
-                product.status = ProductStatus.PACKER
-                product.internal_code = product.old_internal_code
-                product.save()
-
-            statement.is_moderated = True
-            statement.save()
+                statement.is_moderated = True
+                statement.save()
 
             return Response('OK!')
 
@@ -275,225 +318,148 @@ class UpdateStatementView(APIView):
 class OrderDetailView(APIView):
     def get(self, request):
         order_id = request.query_params.get('order_id')
+        validators = order_validators(order_id)
+        if validators is None:
+            return Response({'error': 'Order not found'}, status=404)
+
+        return conditional_response(request, lambda: self.order_progress(order_id), *validators)
+
+    def order_progress(self, order_id):
         order = (
             Order.objects
             .filter(id=order_id)
-            .prefetch_related(
-                'order_products__details',
-                'products__works__staff'
-            )
+            .prefetch_related('order_products__details')
             .first()
         )
 
         if not order:
             return Response({'error': 'Order not found'}, status=404)
 
-        # === 1. СВОДКА ПО ВСЕМ ПРОДУКТАМ ===
-        summary = dict(
-            order.products
-            .values('status')
-            .annotate(total=Count('id'))
-            .values_list('status', 'total')
-        )
-
-        summary = {
-            status.name: summary.get(status.value, 0)
-            for status in ProductStatus
-        }
-
-        # === 2. Детализация по каждому OrderProduct ===
-        info = []
-
-        for op in order.order_products.all():
-            planned_total = sum(d.amount for d in op.details.all())
-
-            # Все продукты для этого order_product (по совпадению названия)
-            related_products = order.products.filter(title=op.product_title)
-
-            # Факт по статусу RECEIVER
-            fact_total = related_products.filter(
-                works__status=ProductStatus.RECEIVER
-            ).distinct().count()
-
-            details_list = []
-            for d in op.details.all():
-                # fact_amount: сколько изделий этого цвета и размера прошли RECEIVER
-                fact_amount = related_products.filter(
-                    color=d.color,
-                    size=d.size,
-                    works__status=ProductStatus.RECEIVER
-                ).distinct().count()
-
-                # группируем работы по статусу и сотрудникам
-                works_data = []
-                works_qs = (
-                    related_products
-                    .filter(color=d.color, size=d.size)
-                    .values(
-                        'works__status',
-                        'works__staff__fullname'
-                    )
-                    .annotate(amount=Count('works__id'))
-                )
-
-                # группировка по статусу
-                status_groups = {}
-                for w in works_qs:
-                    st = w['works__status']
-                    status_groups.setdefault(st, {})
-                    status_groups[st][w['works__staff__fullname']] = w['amount']
-
-                for st, staffs in status_groups.items():
-                    works_data.append({
-                        'status': st,
-                        'amount': sum(staffs.values()),
-                        'staffs': [
-                            {'fullname': name, 'amount': cnt}
-                            for name, cnt in staffs.items()
-                        ]
-                    })
-
-                details_list.append({
-                    'color': d.color,
-                    'size': d.size,
-                    'planned_amount': d.amount,
-                    'fact_amount': fact_amount,
-                    'works': works_data
-                })
-
-            info.append({
-                'product_title': op.product_title,
-                'planned_total': planned_total,
-                'fact_total': fact_total,
-                'details': details_list
-            })
-
-        # === 3. Формируем итог ===
-        result = {
-            'summary': summary,
-            'info': info
-        }
-
-        return Response(result)
+        return Response(get_order_progress(order))
 
 
 class PDFHSCodeView(APIView):
     permission_classes = [IsAuthenticated, IsDirector]
 
+    @extend_schema(
+        request=PDFImportSerializer(),
+        responses={202: PDFImportJobCreatedSerializer}
+    )
     def post(self, request, *args, **kwargs):
-        file = request.FILES.get("file")
-        if not file:
-            return Response({"error": "Файл не найден"}, status=400)
-        if file.content_type != "application/pdf":
-            return Response({"error": "Только PDF допустим"}, status=400)
-
-        order_id = request.data.get('order_id')
-        title = request.data.get('product_title')
-        color = request.data.get('color')
-        size = request.data.get('size')
-
-        pdf_bytes = file.read()
-        pdf_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-
-        products = Product.objects.filter(
-            order_id=order_id,
-            title=title,
-            color=color,
-            size=size
-        ).prefetch_related('codes')
-
-        create_data = []
-
-        for index, product in enumerate(products, start=0):
-            page = pdf_doc[index]
-            width, height = page.rect.width, page.rect.height
-            clip = fitz.Rect(0, 4/5*height, width/2, height)
-            raw_text = page.get_text("text", clip=clip)
-            code = "".join([line.strip() for line in raw_text.split("\n") if line.strip()])
-
-            pix = page.get_pixmap(dpi=300)  # без clip, вся страница
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            buf = io.BytesIO()
-            img.save(buf, format="PNG")
-            buf.seek(0)
-            django_file = ContentFile(buf.read(), name=f"{title}-{size}-{color}.png")
-
-            product.codes.filter(type=CodeType.HS).delete()
-
-            create_data.append(
-                ProductCode(
-                    product=product,
-                    file=django_file,
-                    code=code,
-                    type=CodeType.HS
-                )
-            )
+        serializer = PDFImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        validated = serializer.validated_data
 
-        ProductCode.objects.bulk_create(create_data)
+        job = PDFImportJob.objects.create(
+            order_id=validated['order_id'],
+            staff_id=get_staff_profile_id(request),
+            type=CodeType.HS,
+            file=validated['file'],
+            product_title=validated['product_title'],
+            color=validated.get('color'),
+            size=validated.get('size'),
+            first_page=validated.get('first_page'),
+            last_page=validated.get('last_page')
+        )
+        enqueue_job(job)
 
-        return Response('ok!')
+        return Response({'job_id': job.id}, status=status.HTTP_202_ACCEPTED)
 
 
 class PDFExtractView(APIView):
+    permission_classes = [IsAuthenticated, IsDirector]
 
+    @extend_schema(
+        request=PDFImportSerializer(),
+        responses={202: PDFImportJobCreatedSerializer}
+    )
     def post(self, request, *args, **kwargs):
-        file = request.FILES.get("file")
-        if not file:
-            return Response({"error": "Файл не найден"}, status=400)
-        if file.content_type != "application/pdf":
-            return Response({"error": "Только PDF допустим"}, status=400)
-
-        order_id = request.data.get('order_id')
-        title = request.data.get('product_title')
-
-        pdf_bytes = file.read()
-        pdf_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        create_data = []
-
-        for page_num, page in enumerate(pdf_doc, start=1):
-            text = page.get_text("text")
-            lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-            size_index = 6
-            code_start_index = 7
-            color_index = 9
-
-            size = lines[size_index] if len(lines) > size_index else ""
-            code_lines = lines[code_start_index:code_start_index + 2] if len(lines) > code_start_index + 1 else []
-            code = "".join(code_lines).replace(" ", "")
-            color = lines[color_index] if len(lines) > color_index else ""
-
-            pix = page.get_pixmap(dpi=300)  # без clip, вся страница
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            buf = io.BytesIO()
-            img.save(buf, format="PNG")
-            buf.seek(0)
-            django_file = ContentFile(buf.read(), name=f"{title}-{size}-{color}.png")
-            products = Product.objects.filter(
-                order_id=order_id,
-                title=title,
-                size=size,
-                color=color
+        serializer = PDFImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        validated = serializer.validated_data
+
+        job = PDFImportJob.objects.create(
+            order_id=validated['order_id'],
+            staff_id=get_staff_profile_id(request),
+            type=CodeType.WB,
+            file=validated['file'],
+            product_title=validated['product_title']
+        )
+        enqueue_job(job)
+
+        return Response({'job_id': job.id}, status=status.HTTP_202_ACCEPTED)
+
+
+class PDFImportJobView(APIView):
+    permission_classes = [IsAuthenticated, IsDirector]
+
+    @extend_schema(parameters=[PDFImportJobQuerySerializer], responses=PDFImportJobSerializer)
+    def get(self, request):
+        serializer = PDFImportJobQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        job = PDFImportJob.objects.filter(id=serializer.validated_data['job_id']).first()
+        if not job:
+            return Response({'error': 'Job not found'}, status=404)
+
+        return Response(PDFImportJobSerializer(job).data)
+
+
+class ExportView(APIView):
+    permission_classes = [IsAuthenticated, IsDirector]
+
+    @extend_schema(parameters=[ExportSerializer])
+    def get(self, request):
+        serializer = ExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        validated = serializer.validated_data
+        entity = validated['entity']
+
+        iterate, columns, csv_rows = EXPORTS[entity]
+        if entity == 'products':
+            items = iterate(order_id=validated.get('order_id'))
+        else:
+            items = iterate()
+
+        if validated['fmt'] == 'csv':
+            response = StreamingHttpResponse(
+                csv_stream(columns, csv_rows(items)),
+                content_type='text/csv; charset=utf-8'
+            )
+            response['Content-Disposition'] = f'attachment; filename="{entity}.csv"'
+        else:
+            response = StreamingHttpResponse(
+                ndjson_stream(items),
+                content_type='application/x-ndjson; charset=utf-8'
             )
+            response['Content-Disposition'] = f'attachment; filename="{entity}.ndjson"'
+
+        return response
+
+
+class ProductivityReportView(APIView):
+    permission_classes = [IsAuthenticated, IsDirector]
 
-            for product in products:
-                ProductCode.objects.filter(
-                    product__order_id=order_id,
-                    product__title=title,
-                    type=CodeType.WB,
-                    product__size=size,
-                    product__color=color
-                ).delete()
-
-                create_data.append(
-                    ProductCode(
-                        product=product,
-                        code=code,
-                        type=CodeType.WB,
-                        file=django_file
-                    )
-                )
-
-        ProductCode.objects.bulk_create(create_data)
-
-        return Response({"ok!"})
+    @extend_schema(parameters=[ProductivityReportSerializer])
+    def get(self, request):
+        serializer = ProductivityReportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        validated = serializer.validated_data
+
+        return Response(productivity_report(
+            validated['date_from'],
+            validated['date_to'],
+            validated['bucket'],
+            validated.get('order_id')
+        ))
+
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsDirector]
+
+    def get(self, request):
+        return Response(cache_stats())
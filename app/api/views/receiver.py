@@ -1,53 +1,97 @@
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
 from drf_spectacular.utils import extend_schema
+from rest_framework import status
 from rest_framework.generics import ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from api.permissions import IsReceiver
-from api.serializers.receiver import OrderSerializer, CreateProductSerializer
-from db.enums import OrderStatus, CodeType, ProductStatus
-from db.models import Order, Product, ProductCode, Work
+from api.cache import CachedResponseMixin
+from api.conditional import conditional_response, order_list_validators
+from api.permissions import IsReceiver, get_staff_profile_id
+from api.serializers.receiver import OrderSerializer, CreateProductSerializer, BulkReceptionSerializer, \
+    BulkReceptionResultSerializer
+from api.serializers.fast import RECEIVER_ORDER_FIELDS, order_values, serialize_orders
+from api.services.reception import receive_bulk, receive_product
+from db.enums import OrderStatus
+from db.models import ClientProfile, Order, OrderProduct, ProductDetail
 
 
-class OrderListView(ListAPIView):
+class OrderListView(CachedResponseMixin, ListAPIView):
     permission_classes = [IsAuthenticated, IsReceiver]
     queryset = Order.objects.filter(
         status=OrderStatus.PROGRES
-    ).select_related('client').prefetch_related('order_products')
+    ).select_related('client').prefetch_related('order_products__details')
     serializer_class = OrderSerializer
+    cache_models = (Order, OrderProduct, ProductDetail, ClientProfile)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(Order.objects.filter(status=OrderStatus.PROGRES))
+        return conditional_response(
+            request,
+            lambda: self.cached_response(request, lambda: self.list_orders(queryset)),
+            *order_list_validators(queryset)
+        )
+
+    def list_orders(self, queryset):
+        rows = self.paginate_queryset(order_values(queryset))
+        return self.get_paginated_response(serialize_orders(rows, RECEIVER_ORDER_FIELDS))
 
 
-class ReceptionView(APIView):
+class ReceptionView(AsyncAPIView):
     permission_classes = [IsAuthenticated, IsReceiver]
 
     @extend_schema(request=CreateProductSerializer())
-    def post(self, request):
+    async def post(self, request):
         serializer = CreateProductSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         validated = serializer.validated_data
 
-        product = Product.objects.create(
-            order_id=validated['order_id'],
-            title=validated["title"],
-            color=validated["color"],
-            size=validated["size"],
-            internal_code=validated["internal_code"],
-            status=ProductStatus.RECEIVER
+        await sync_to_async(receive_product)(
+            validated['order_id'],
+            validated['title'],
+            validated['color'],
+            validated['size'],
+            validated['internal_code'],
+            validated['file'],
+            get_staff_profile_id(request)
         )
 
-        ProductCode.objects.create(
-            product=product,
-            file=validated["file"],
-            code=validated["internal_code"],
-            type=CodeType.INTERNAL
-        )
+        return Response('OK!')
 
-        Work.objects.create(
-            product=product,
-            staff=request.user.staff_profile,
-            status=ProductStatus.RECEIVER,
-        )
 
-        return Response('OK!')
+class BulkReceptionView(APIView):
+    permission_classes = [IsAuthenticated, IsReceiver]
+
+    def initialize_request(self, request, *args, **kwargs):
+        # файлы пачки пишутся во временные файлы, а не держатся в памяти
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    @extend_schema(
+        request=BulkReceptionSerializer(),
+        responses=BulkReceptionResultSerializer()
+    )
+    def post(self, request):
+        serializer = BulkReceptionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        validated = serializer.validated_data
+
+        order = Order.objects.filter(id=validated['order_id']).first()
+        if not order:
+            return Response(
+                'Заказ не сущестует!',
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = receive_bulk(
+            order,
+            validated['manifest'],
+            request.FILES,
+            get_staff_profile_id(request)
+        )
+        return Response(result)
@@ -1,51 +1,45 @@
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from api.permissions import IsOTK, IsPacker, IsMarker
-from api.serializers.work import OTKWorkSerializer, PackerWorkSerializer, MarkerFilesSerializer, MarkerWorkSerializer
-from db.enums import ProductStatus, CodeType, StatementType
-from db.models import Product, Work, WorkImage, Statement
+from api.cache import CachedResponseMixin
+from api.permissions import IsOTK, IsPacker, IsMarker, get_staff_profile_id
+from api.serializers.work import OTKWorkSerializer, PackerWorkSerializer, MarkerFilesSerializer, MarkerWorkSerializer, \
+    BatchWorkSerializer, BatchWorkResultSerializer
+from api.services import workflow
+from api.services.batch import process_otk_batch, process_packer_batch, process_marker_batch
+from api.services.scan import aget_product_by_internal_code, aresolve_product
+from api.services.transitions import apply_transition
+from db.enums import CodeType, StatementType
+from db.models import ProductCode, Statement
 
 
-class OTKWorkView(APIView):
+class OTKWorkView(AsyncAPIView):
     permission_classes = [IsAuthenticated, IsOTK]
 
     @extend_schema(request=OTKWorkSerializer())
-    def post(self, request):
+    async def post(self, request):
         serializer = OTKWorkSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         validated = serializer.validated_data
 
-        if validated.get('is_defect'):
-            prod_status = ProductStatus.DEFECT
-        else:
-            prod_status = ProductStatus.OTK
-
-        product = Product.objects.filter(internal_code=validated['internal_code']).first()
+        product = await aget_product_by_internal_code(validated['internal_code'])
         if product:
 
-            if product.status == ProductStatus.RECEIVER:
-
-                product.status = prod_status
-                product.save()
-
-                work = Work.objects.create(
-                    product=product,
-                    staff=request.user.staff_profile,
-                    status=prod_status,
-                    comment=validated.get('comment')
-                )
-
-                if validated.get('is_defect'):
-                    WorkImage.objects.create(
-                        work=work,
-                        image=validated.get('image')
-                    )
+            product = await sync_to_async(apply_transition)(
+                product,
+                workflow.DEFECT if validated.get('is_defect') else workflow.OTK,
+                staff_id=get_staff_profile_id(request),
+                comment=validated.get('comment'),
+                images=[validated.get('image')]
+            )
 
+            if product:
                 return Response('OK!')
             return Response(
                 'Повторно провести не получится!',
@@ -57,32 +51,44 @@ class OTKWorkView(APIView):
         )
 
 
-class PackerWorkView(APIView):
+class OTKBatchWorkView(APIView):
+    permission_classes = [IsAuthenticated, IsOTK]
+
+    @extend_schema(
+        request=BatchWorkSerializer(),
+        responses=BatchWorkResultSerializer(many=True)
+    )
+    def post(self, request):
+        serializer = BatchWorkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = process_otk_batch(
+            serializer.validated_data['internal_codes'],
+            get_staff_profile_id(request)
+        )
+        return Response(results)
+
+
+class PackerWorkView(AsyncAPIView):
     permission_classes = [IsAuthenticated, IsPacker]
 
     @extend_schema(request=PackerWorkSerializer())
-    def post(self, request):
+    async def post(self, request):
         serializer = PackerWorkSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         validated = serializer.validated_data
 
-        product = Product.objects.filter(internal_code=validated['internal_code']).first()
+        product = await aget_product_by_internal_code(validated['internal_code'])
         if product:
 
-            if product.status in [
-                ProductStatus.RECEIVER,
-                ProductStatus.OTK
-            ]:
-                product.status = ProductStatus.PACKER
-                product.save()
-
-                Work.objects.create(
-                    product=product,
-                    staff=request.user.staff_profile,
-                    status=product.status,
-                )
+            product = await sync_to_async(apply_transition)(
+                product,
+                workflow.PACKER,
+                staff_id=get_staff_profile_id(request)
+            )
 
+            if product:
                 return Response('OK!')
             return Response(
                 'Повторно провести не получится!',
@@ -93,30 +99,44 @@ class PackerWorkView(APIView):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-class MarkerImagesView(APIView):
+class PackerBatchWorkView(APIView):
+    permission_classes = [IsAuthenticated, IsPacker]
+
+    @extend_schema(
+        request=BatchWorkSerializer(),
+        responses=BatchWorkResultSerializer(many=True)
+    )
+    def post(self, request):
+        serializer = BatchWorkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = process_packer_batch(
+            serializer.validated_data['internal_codes'],
+            get_staff_profile_id(request)
+        )
+        return Response(results)
+
+
+class MarkerImagesView(CachedResponseMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated, IsMarker]
+    cache_models = (ProductCode,)
 
     @extend_schema(
         responses=MarkerFilesSerializer(many=True)
     )
-    def get(self, request):
+    async def get(self, request):
         internal_code = request.query_params.get('internal_code')
 
-        product = Product.objects.filter(internal_code=internal_code).first()
+        product = await aget_product_by_internal_code(internal_code)
         if product:
 
-            if product.status in [
-                ProductStatus.RECEIVER,
-                ProductStatus.PACKER
-            ]:
-                codes = product.codes.exclude(type=CodeType.INTERNAL)
-
-                serializer = MarkerFilesSerializer(
-                    codes,
-                    many=True,
-                    context=self.get_renderer_context()
+            if workflow.can_apply(product.status, workflow.MARKER):
+                # версии кодов ведутся по изделию, статус проверяется без кэша
+                return await sync_to_async(self.cached_response)(
+                    request,
+                    lambda: self.marker_files(product),
+                    scope=product.id
                 )
-                return Response(serializer.data)
             return Response(
                 'Повторно провести не получится!',
                 status=status.HTTP_400_BAD_REQUEST
@@ -126,35 +146,35 @@ class MarkerImagesView(APIView):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-class MarkerWorkView(APIView):
+    def marker_files(self, product):
+        serializer = MarkerFilesSerializer(
+            product.codes.exclude(type=CodeType.INTERNAL),
+            many=True,
+            context=self.get_renderer_context()
+        )
+        return Response(serializer.data)
+
+
+class MarkerWorkView(AsyncAPIView):
     permission_classes = [IsAuthenticated, IsMarker]
 
     @extend_schema(request=MarkerWorkSerializer())
-    def post(self, request):
+    async def post(self, request):
         serializer = MarkerWorkSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         validated = serializer.validated_data
 
-        product = Product.objects.filter(internal_code=validated['internal_code']).first()
+        product = await aget_product_by_internal_code(validated['internal_code'])
         if product:
 
-            if product.status in [
-                ProductStatus.RECEIVER,
-                ProductStatus.PACKER
-            ]:
-                hs = product.codes.filter(type=CodeType.HS).first()
-                product.status = ProductStatus.MARKER
-                product.old_internal_code = product.internal_code
-                product.internal_code = hs.code if hs else product.internal_code
-                product.save()
-
-                Work.objects.create(
-                    product=product,
-                    staff=request.user.staff_profile,
-                    status=product.status,
-                )
+            product = await sync_to_async(apply_transition)(
+                product,
+                workflow.MARKER,
+                staff_id=get_staff_profile_id(request)
+            )
 
+            if product:
                 return Response('OK!')
             return Response(
                 'Повторно провести не получится!',
@@ -166,23 +186,45 @@ class MarkerWorkView(APIView):
         )
 
 
-class CreateStatementView(APIView):
+class MarkerBatchWorkView(APIView):
     permission_classes = [IsAuthenticated, IsMarker]
 
-    @extend_schema(request=MarkerWorkSerializer())
+    @extend_schema(
+        request=BatchWorkSerializer(),
+        responses=BatchWorkResultSerializer(many=True)
+    )
     def post(self, request):
+        serializer = BatchWorkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = process_marker_batch(
+            serializer.validated_data['internal_codes'],
+            get_staff_profile_id(request)
+        )
+        return Response(results)
+
+
+class CreateStatementView(AsyncAPIView):
+    permission_classes = [IsAuthenticated, IsMarker]
+
+    @extend_schema(request=MarkerWorkSerializer())
+    async def post(self, request):
         serializer = MarkerWorkSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         validated = serializer.validated_data
 
-        product = Product.objects.filter(internal_code=validated['internal_code']).first()
+        # на изделии может остаться как внутренний код, так и код ЧЗ
+        product = await aresolve_product(
+            validated['internal_code'],
+            types=[CodeType.INTERNAL, CodeType.HS]
+        )
         if product:
-            statement, created = Statement.objects.get_or_create(
+            statement, created = await Statement.objects.aget_or_create(
                 product=product,
                 type=StatementType.CODE,
                 is_moderated=False,
-                staff=request.user.staff_profile
+                staff_id=get_staff_profile_id(request)
             )
             if created:
                 return Response('OK!')
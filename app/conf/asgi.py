@@ -8,9 +8,16 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
 import os
+from importlib import import_module
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')
 
 application = get_asgi_application()
+
+# Django loads the URLconf (and with it the views, fitz and PIL) on the
+# first request. Import it here so that with gunicorn preload_app it is
+# loaded once in the master and shared by workers through copy-on-write.
+import_module(settings.ROOT_URLCONF)
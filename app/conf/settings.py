@@ -13,7 +13,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -93,11 +93,60 @@ DATABASES = {
         'USER': config('POSTGRES_USER'),
         'PASSWORD': config('POSTGRES_PASSWORD'),
         'HOST': config('POSTGRES_HOST'),
-        'PORT': config('POSTGRES_PORT', cast=int)
+        'PORT': config('POSTGRES_PORT', cast=int),
+        # Seconds to keep a connection open between requests (None - forever).
+        # Connections are per thread, so keep 0 under ASGI and use the pooler instead.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=lambda v: None if v == 'None' else int(v)),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        # Required behind PgBouncer in transaction mode: named cursors of
+        # QuerySet.iterator() (exports) do not survive between transactions
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory by default. It is per process: the model version keys
+# (db.cache), cached responses and staff roles live in each worker
+# separately, so a change made in one worker reaches the others only when
+# their entries expire (RESPONSE_CACHE_TIMEOUT, STAFF_CACHE_TIMEOUT).
+# A shared backend such as django.core.cache.backends.redis.RedisCache with
+# CACHE_LOCATION=redis://... makes invalidation immediate everywhere.
+# LocMem culls a third of its entries once MAX_ENTRIES is reached, which
+# drops versions and roles along with responses, so the limit is sized for
+# per-product ProductCode versions plus cached responses.
+
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default='levelup'),
+        'OPTIONS': (
+            {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=20000, cast=int)}
+            if CACHE_BACKEND.endswith('LocMemCache') else {}
+        ),
+    },
+    # Closed buckets of the productivity report (api.services.reports): a
+    # year of days is 366 keys, kept apart so they never evict 'default'
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'levelup-reports',
+        'OPTIONS': {'MAX_ENTRIES': config('REPORT_CACHE_MAX_ENTRIES', default=5000, cast=int)},
+    },
+}
+
+# Cached API responses (api.cache): TTL in seconds, 0 disables;
+# view class names to exclude, comma separated
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=60, cast=int)
+RESPONSE_CACHE_DISABLED = config('RESPONSE_CACHE_DISABLED', default='', cast=Csv())
+# Staff role used by permission checks (api.permissions): saving a
+# StaffProfile or user drops it at once in the current process, with LocMem
+# other workers see a changed or revoked role only after this TTL, seconds
+STAFF_CACHE_TIMEOUT = config('STAFF_CACHE_TIMEOUT', default=30, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -136,6 +185,25 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media-files/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Bulk reception: one multipart request carries a file per received product
+DATA_UPLOAD_MAX_NUMBER_FILES = config('DATA_UPLOAD_MAX_NUMBER_FILES', default=5000, cast=int)
+
+# PDF imports: number of processes rendering label pages
+PDF_RENDER_WORKERS = config('PDF_RENDER_WORKERS', default=os.cpu_count() or 1, cast=int)
+
+# Label images: DPI, color mode ('rgb', 'gray' or 1-bit 'mono') and
+# optional clip as page fractions "x0,y0,x1,y1"
+LABEL_DPI = config('LABEL_DPI', default=300, cast=int)
+LABEL_COLOR_MODE = config('LABEL_COLOR_MODE', default='gray')
+LABEL_CLIP = config('LABEL_CLIP', default='', cast=lambda v: tuple(float(x) for x in v.split(',')) if v else None)
+# 'thread' - imports run in a thread of the web process,
+# 'command' - imports are picked up by `manage.py pdf_import_worker`
+PDF_IMPORT_WORKER = config('PDF_IMPORT_WORKER', default='thread')
+# RUNNING import whose progress has not moved for this many seconds is
+# picked up again by claim_next_job: by the command worker, or in 'thread'
+# mode when a pdf pool worker starts and after each enqueued import
+PDF_IMPORT_STALE_AFTER = config('PDF_IMPORT_STALE_AFTER', default=600, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -143,12 +211,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'db.MyUser'
 
+# Stateless mode builds request.user from token claims without loading MyUser;
+# deactivated users are rejected within JWT_REVOCATION_REFRESH seconds
+JWT_STATELESS = config('JWT_STATELESS', default=False, cast=bool)
+JWT_REVOCATION_REFRESH = config('JWT_REVOCATION_REFRESH', default=30, cast=int)
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'api.authentication.StatelessJWTAuthentication'
+        if JWT_STATELESS else
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
     "COERCE_DECIMAL_TO_STRING": False,
 }
 
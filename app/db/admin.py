@@ -10,6 +10,8 @@ admin.site.register(Order)
 admin.site.register(Work)
 admin.site.register(WorkImage)
 admin.site.register(Statement)
+admin.site.register(OrderProgress)
+admin.site.register(PDFImportJob)
 
 class ProductCodeInline(NestedStackedInline):
     model = ProductCode
@@ -0,0 +1,70 @@
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+from db.enums import OrderStatus, UserStatus
+from db.models import ClientProfile, MyUser, Order, Product
+
+# Общие части management-команд bench_*. Синтетические данные создаются
+# в транзакции, которая откатывается, поэтому в базе ничего не остается.
+
+
+@contextmanager
+def rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def timings(func, repeat):
+    """Время repeat вызовов func, мс."""
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def describe(values):
+    return f'median {statistics.median(values):.3f} ms, p99 {percentile(values, 0.99):.3f} ms'
+
+
+def analyze(*models):
+    """Свежая статистика планировщика после массовой вставки."""
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+
+def synthetic_order():
+    user = MyUser.objects.create_user(username=f'bench-{uuid.uuid4()}', status=UserStatus.CLIENT)
+    client = ClientProfile.objects.create(user=user, fullname='bench')
+    return Order.objects.create(client=client, status=OrderStatus.PROGRES)
+
+
+def synthetic_products(order, count, batch_size=10000, prefix='bench', **fields):
+    """count изделий заказа с internal_code <prefix>-<номер>."""
+    for start in range(0, count, batch_size):
+        Product.objects.bulk_create(
+            [
+                Product(
+                    order=order,
+                    title='bench',
+                    color='black',
+                    size='M',
+                    internal_code=f'{prefix}-{number}',
+                    **fields
+                )
+                for number in range(start, min(start + batch_size, count))
+            ],
+            batch_size=batch_size
+        )
@@ -0,0 +1,57 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Версии кэшируемых данных по моделям. Версия входит в ключ кэша, поэтому
+# после изменения модели старые записи просто перестают читаться.
+
+
+def version_key(model, scope=None):
+    key = f'cache-version:{model._meta.label_lower}'
+    if scope is not None:
+        key = f'{key}:{scope}'
+    return key
+
+
+def model_versions(*models, scope=None):
+    """Текущие версии моделей одним запросом к кэшу."""
+    keys = [version_key(model, scope) for model in models]
+    versions = cache.get_many(keys)
+
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        # версия от времени, а не 1: вытесненный счетчик не вернется к старому значению
+        for key, value in missing.items():
+            cache.add(key, value, None)
+        versions.update(cache.get_many(missing.keys()))
+
+    return [versions.get(key, 0) for key in keys]
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_version(model, scope=None):
+    """Новая версия после коммита, чтобы в кэш не попали данные незавершенной транзакции."""
+    key = version_key(model, scope)
+    transaction.on_commit(lambda: _bump(key))
+
+
+def bump_versions(model, scopes):
+    for scope in set(scopes):
+        bump_version(model, scope)
+
+
+def staff_cache_key(user_id):
+    return f'staff-profile:{user_id}'
+
+
+def invalidate_staff(user_id):
+    """Роль пользователя (api.permissions.get_staff) перечитается после коммита."""
+    key = staff_cache_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
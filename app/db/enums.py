@@ -38,4 +38,10 @@ class StatementType(models.IntegerChoices):
 class OrderStatus(models.IntegerChoices):
     NEW = 1, 'НОВЫЙ'
     PROGRES = 2, 'В ПРОЦЕССЕ'
-    DONE = 3, 'ГОТОВО'
\ No newline at end of file
+    DONE = 3, 'ГОТОВО'
+
+class JobStatus(models.IntegerChoices):
+    NEW = 1, 'НОВАЯ'
+    RUNNING = 2, 'В ПРОЦЕССЕ'
+    DONE = 3, 'ГОТОВО'
+    FAILED = 4, 'ОШИБКА'
@@ -0,0 +1,50 @@
+import hashlib
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+# файлы этикеток, адресуемые по содержимому и общие для многих ProductCode
+LABELS_DIR = 'labels'
+
+
+def label_name(data, ext='png'):
+    digest = hashlib.sha256(data).hexdigest()
+    return f'{LABELS_DIR}/{digest[:2]}/{digest}.{ext}'
+
+
+def store_label(data, ext='png'):
+    """Сохраняет этикетку один раз и возвращает имя файла в хранилище."""
+    name = label_name(data, ext)
+    if default_storage.exists(name):
+        return name
+    return default_storage.save(name, ContentFile(data))
+
+
+def is_shared_label(name):
+    return bool(name) and name.startswith(f'{LABELS_DIR}/')
+
+
+def iter_labels(path=LABELS_DIR):
+    if not default_storage.exists(path):
+        return
+    dirs, files = default_storage.listdir(path)
+    for file in files:
+        yield f'{path}/{file}'
+    for directory in dirs:
+        yield from iter_labels(f'{path}/{directory}')
+
+
+def find_orphan_labels(referenced, grace=timedelta(hours=24)):
+    """
+    Файлы этикеток, на которые не ссылается ни один ProductCode.
+    Свежие файлы пропускаются - импорт мог записать файл, но еще не строки.
+    """
+    border = timezone.now() - grace
+    for name in iter_labels():
+        if name in referenced:
+            continue
+        if default_storage.get_modified_time(name) > border:
+            continue
+        yield name
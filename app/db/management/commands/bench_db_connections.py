@@ -0,0 +1,63 @@
+import uuid
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from api.services.scan import aresolve_product
+from db.benchmarks import describe, synthetic_order, synthetic_products, timings
+
+MODES = [
+    ('CONN_MAX_AGE=0', 0, False),
+    ('CONN_MAX_AGE=60', 60, False),
+    ('CONN_MAX_AGE=60, CONN_HEALTH_CHECKS', 60, True),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Задержка запроса сканирования с новым соединением на каждый запрос и с '
+        'постоянными соединениями. Запрос имитируется сигналами request_started/'
+        'request_finished вокруг aresolve_product, как в обработчике Django. Для '
+        'сравнения с PgBouncer запустить с POSTGRES_HOST на pgbouncer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--products', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        prefix = f'conn-{uuid.uuid4().hex[:8]}'
+        # данные коммитятся: close_old_connections закрывает соединение
+        # с открытой транзакцией, откатываемый блок здесь не подходит
+        order = synthetic_order()
+        synthetic_products(order, options['products'], prefix=prefix)
+
+        opened = []
+
+        def count(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(count)
+        try:
+            codes = iter(range(options['requests'] * len(MODES)))
+
+            def request():
+                request_started.send(sender=self.__class__)
+                try:
+                    async_to_sync(aresolve_product)(f'{prefix}-{next(codes) % options["products"]}')
+                finally:
+                    request_finished.send(sender=self.__class__)
+
+            for label, max_age, health_checks in MODES:
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                connection.settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                opened.clear()
+                result = timings(request, options['requests'])
+                self.stdout.write(f'{label}: {describe(result)}, соединений открыто {len(opened)}')
+        finally:
+            connection_created.disconnect(count)
+            order.client.user.delete()
@@ -0,0 +1,90 @@
+import os
+import signal
+import socket
+import subprocess
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+READY = 'Application startup complete'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def memory(pid):
+    """Rss и Pss процесса в КБ из /proc/<pid>/smaps_rollup (только Linux)."""
+    result = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if name in ('Rss', 'Pss'):
+                result[name] = int(value.split()[0])
+    return result
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+class Command(BaseCommand):
+    help = (
+        'Время запуска gunicorn -c gunicorn.conf.py до готовности всех воркеров и '
+        'память мастера с воркерами (Rss и Pss) с GUNICORN_PRELOAD=true и false'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--pool', choices=['web', 'pdf'], default='web')
+        parser.add_argument('--timeout', type=float, default=120, help='ожидание запуска, с')
+
+    def handle(self, *args, **options):
+        if not os.path.exists('/proc/self/smaps_rollup'):
+            raise CommandError('нужен Linux с /proc/<pid>/smaps_rollup')
+
+        for preload in (False, True):
+            started, master, workers = self.run(preload, options)
+            rss = sum(item['Rss'] for item in [master, *workers])
+            pss = sum(item['Pss'] for item in [master, *workers])
+            self.stdout.write(
+                f'preload={preload}: запуск {started:.2f} s, '
+                f'Rss {rss / 1024:.0f} MB, Pss {pss / 1024:.0f} MB '
+                f'(воркер Pss {sum(item["Pss"] for item in workers) / len(workers) / 1024:.0f} MB)'
+            )
+
+    def run(self, preload, options):
+        env = {
+            **os.environ,
+            'GUNICORN_PRELOAD': str(preload),
+            'GUNICORN_POOL': options['pool'],
+            'GUNICORN_WORKERS': str(options['workers']),
+            'GUNICORN_BIND': f'127.0.0.1:{free_port()}',
+        }
+        with tempfile.TemporaryFile('w+') as log:
+            start = time.perf_counter()
+            process = subprocess.Popen(
+                ['gunicorn', '-c', 'gunicorn.conf.py'],
+                cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=log
+            )
+            try:
+                # uvicorn пишет READY в лог каждого воркера
+                while True:
+                    log.seek(0)
+                    if log.read().count(READY) >= options['workers']:
+                        break
+                    if process.poll() is not None or time.perf_counter() - start > options['timeout']:
+                        log.seek(0)
+                        raise CommandError(f'gunicorn не запустился:\n{log.read()[-2000:]}')
+                    time.sleep(0.05)
+                started = time.perf_counter() - start
+
+                return started, memory(process.pid), [memory(pid) for pid in children(process.pid)]
+            finally:
+                process.send_signal(signal.SIGTERM)
+                process.wait()
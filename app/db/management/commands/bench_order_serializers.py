@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import director, receiver
+from api.serializers.fast import DIRECTOR_ORDER_FIELDS, RECEIVER_ORDER_FIELDS, order_values, serialize_orders
+from db.benchmarks import rolled_back, synthetic_order, timings
+from db.enums import OrderStatus
+from db.models import Order, OrderProduct, ProductDetail
+
+
+class Command(BaseCommand):
+    help = (
+        'Сериализация списка заказов: OrderSerializer (ModelSerializer) против '
+        'api.serializers.fast на синтетических заказах (данные откатываются)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=10000)
+        parser.add_argument('--products', type=int, default=2, help='позиций в заказе')
+        parser.add_argument('--details', type=int, default=3, help='цветов/размеров в позиции')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            client = synthetic_order().client
+            orders = Order.objects.bulk_create(
+                [Order(client=client, status=OrderStatus.PROGRES) for _ in range(options['orders'])],
+                batch_size=5000
+            )
+            order_products = OrderProduct.objects.bulk_create(
+                [
+                    OrderProduct(order=order, product_title=f'title-{number}')
+                    for order in orders
+                    for number in range(options['products'])
+                ],
+                batch_size=5000
+            )
+            ProductDetail.objects.bulk_create(
+                [
+                    ProductDetail(order_product=order_product, color=f'color-{number}', size='M', amount=10)
+                    for order_product in order_products
+                    for number in range(options['details'])
+                ],
+                batch_size=5000
+            )
+
+            queryset = Order.objects.filter(client=client).order_by('-created_at', '-id')
+            for name, serializer, fields in [
+                ('director', director.OrderSerializer, DIRECTOR_ORDER_FIELDS),
+                ('receiver', receiver.OrderSerializer, RECEIVER_ORDER_FIELDS),
+            ]:
+                def model_serializer():
+                    return serializer(
+                        queryset.select_related('client').prefetch_related('order_products__details'),
+                        many=True
+                    ).data
+
+                def fast():
+                    return serialize_orders(list(order_values(queryset)), fields)
+
+                old = self.measure(f'{name} ModelSerializer', model_serializer, options['repeat'])
+                new = self.measure(f'{name} fast', fast, options['repeat'])
+
+                if JSONRenderer().render(model_serializer()) != JSONRenderer().render(fast()):
+                    raise AssertionError(f'{name}: JSON отличается')
+                self.stdout.write(f'{name}: JSON совпадает побайтно, ускорение x{old / new:.1f}')
+
+    def measure(self, label, build, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            build()
+        best = min(timings(build, repeat))
+        self.stdout.write(f'{label}: {best:.0f} ms, запросов {len(queries)}')
+        return best
@@ -0,0 +1,48 @@
+import os
+import time
+
+import fitz
+from django.core.management.base import BaseCommand
+
+from api.services.pdf import GRAY, MONO, RGB, iter_render_pages
+
+
+def label_pdf(pages):
+    """PDF с этикетками 58x40 мм: текст кода и штрихи, как у этикеток ЧЗ."""
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page(width=164, height=113)
+        page.insert_text((8, 16), f'0104601234567890215{number:08d}', fontsize=7)
+        for bar in range(40):
+            x = 8 + bar * 2.5
+            width = 0.6 + (number + bar) % 3 * 0.5
+            page.draw_rect(fitz.Rect(x, 24, x + width, 100), color=None, fill=(0, 0, 0))
+    return doc.tobytes()
+
+
+class Command(BaseCommand):
+    help = 'Скорость отрисовки страниц этикеток в PNG: один процесс против пула процессов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=200, help='страниц в сгенерированном PDF')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='процессов в пуле')
+        parser.add_argument('--dpi', type=int, default=300)
+        parser.add_argument('--mode', choices=[RGB, GRAY, MONO], default=GRAY)
+
+    def handle(self, *args, **options):
+        pdf_bytes = label_pdf(options['pages'])
+        indexes = range(options['pages'])
+        render = {'dpi': options['dpi'], 'mode': options['mode']}
+
+        results = {}
+        for workers in sorted({1, options['workers']}):
+            start = time.perf_counter()
+            results[workers] = list(iter_render_pages(pdf_bytes, indexes, workers=workers, **render))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'workers={workers}: {elapsed:.2f} s, {options["pages"] / elapsed:.1f} стр/с'
+            )
+
+        if results[1] != results[options['workers']]:
+            raise AssertionError('результат пула отличается от последовательной отрисовки')
+        self.stdout.write('PNG пула совпадают с последовательной отрисовкой побайтно')
@@ -0,0 +1,82 @@
+import random
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.services.scan import aresolve_product
+from db.benchmarks import analyze, describe, rolled_back, synthetic_order, synthetic_products
+from db.enums import CodeType
+from db.models import Product, ProductCode
+
+# индексы кодов сканирования; без них - схема до индексации
+SCAN_INDEXES = ['product_internal_code_idx', 'product_old_internal_code_idx', 'product_code_code_idx']
+
+
+class Command(BaseCommand):
+    help = (
+        'Время поиска изделия по коду сканирования на синтетической таблице '
+        'с индексами кодов и без них (данные и DROP INDEX откатываются)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100000, help='изделий в синтетической таблице')
+        parser.add_argument('--lookups', type=int, default=500, help='поисков на каждый замер')
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            order = synthetic_order()
+            synthetic_products(order, options['products'])
+
+            # каждое десятое изделие промаркировано: код ЧЗ стал кодом
+            # сканирования, прежний код - в old_internal_code
+            marked = list(Product.objects.filter(order=order).order_by()[::10])
+            for product in marked:
+                product.old_internal_code = product.internal_code
+                product.internal_code = f'hs-{product.internal_code}'
+            Product.objects.bulk_update(marked, ['internal_code', 'old_internal_code'], batch_size=10000)
+            ProductCode.objects.bulk_create(
+                [
+                    ProductCode(product=product, code=product.internal_code, type=CodeType.HS, file='')
+                    for product in marked
+                ],
+                batch_size=10000
+            )
+            analyze(Product, ProductCode)
+
+            # исходные коды (у промаркированных - old_internal_code) и коды ЧЗ вперемешку
+            codes = [f'bench-{random.randrange(options["products"])}' for _ in range(options['lookups'])]
+            codes += [product.internal_code for product in random.sample(marked, min(len(marked), options['lookups']))]
+            random.shuffle(codes)
+
+            self.measure('с индексами', codes)
+
+            with connection.cursor() as cursor:
+                for name in SCAN_INDEXES:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+            analyze(Product, ProductCode)
+
+            self.measure('без индексов', codes)
+
+    def measure(self, label, codes):
+        found = []
+
+        async def lookups():
+            # один цикл событий на все поиски, как в async view
+            values = []
+            for code in codes:
+                start = time.perf_counter()
+                found.append(await aresolve_product(code))
+                values.append((time.perf_counter() - start) * 1000)
+            return values
+
+        with CaptureQueriesContext(connection) as queries:
+            values = async_to_sync(lookups)()
+
+        if not all(found):
+            raise AssertionError('код не найден')
+        self.stdout.write(
+            f'{label}: {describe(values)}, запросов на поиск {len(queries) / len(codes):g}'
+        )
@@ -0,0 +1,82 @@
+import json
+import statistics
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from db.benchmarks import percentile, synthetic_order, synthetic_products
+from db.enums import ProductStatus, StaffRole, UserStatus
+from db.models import MyUser, StaffProfile, Work
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест сканирования ОТК по HTTP: --terminals терминалов параллельно '
+        'сканируют свои изделия на запущенном сервере --url. Для сравнения запустить '
+        'против gunicorn --worker-class sync conf.wsgi:application и против gunicorn conf.asgi:application '
+        '(uvicorn-воркеры из gunicorn.conf.py) на той же базе. Тестовые изделия и сотрудник '
+        'создаются и удаляются командой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='адрес запущенного сервера')
+        parser.add_argument('--terminals', type=int, default=200, help='одновременных терминалов')
+        parser.add_argument('--scans', type=int, default=10, help='сканирований на терминал')
+        parser.add_argument('--timeout', type=float, default=60)
+
+    def handle(self, *args, **options):
+        prefix = f'load-{uuid.uuid4().hex[:8]}'
+        total = options['terminals'] * options['scans']
+
+        order = synthetic_order()
+        synthetic_products(order, total, prefix=prefix, status=ProductStatus.RECEIVER)
+        user = MyUser.objects.create_user(username=prefix, status=UserStatus.STAFF)
+        StaffProfile.objects.create(user=user, fullname=prefix, role=StaffRole.OTK)
+        token = str(AccessToken.for_user(user))
+
+        def terminal(number):
+            results = []
+            for scan in range(options['scans']):
+                code = f'{prefix}-{number * options["scans"] + scan}'
+                request = Request(
+                    f'{options["url"].rstrip("/")}/api/v1/otk/work/',
+                    data=json.dumps({'internal_code': code}).encode(),
+                    headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {token}'},
+                    method='POST'
+                )
+                start = time.perf_counter()
+                try:
+                    with urlopen(request, timeout=options['timeout']) as response:
+                        status = response.status
+                except HTTPError as e:
+                    status = e.code
+                except OSError as e:
+                    status = type(e).__name__
+                results.append((status, (time.perf_counter() - start) * 1000))
+            return results
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['terminals']) as executor:
+                results = [item for items in executor.map(terminal, range(options['terminals'])) for item in items]
+            elapsed = time.perf_counter() - start
+
+            latencies = [latency for _, latency in results]
+            self.stdout.write(
+                f'{total} сканирований за {elapsed:.1f} s: {total / elapsed:.1f} запр/с, '
+                f'median {statistics.median(latencies):.0f} ms, p99 {percentile(latencies, 0.99):.0f} ms'
+            )
+            self.stdout.write(f'ответы: {dict(Counter(status for status, _ in results))}')
+            self.stdout.write(
+                f'работ ОТК: {Work.objects.filter(product__order=order, status=ProductStatus.OTK).count()} из {total}'
+            )
+        finally:
+            # заказ, изделия и работы удаляются каскадом
+            order.client.user.delete()
+            user.delete()
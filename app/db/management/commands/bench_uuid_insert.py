@@ -0,0 +1,70 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from db.benchmarks import rolled_back, synthetic_order
+from db.models import Product
+from db.uuids import uuid7
+
+
+def primary_key_size(model):
+    """Размер индекса первичного ключа в байтах; None, если база не сообщает."""
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = '''
+            SELECT pg_relation_size(i.indexrelid)
+            FROM pg_index i
+            WHERE i.indrelid = %s::regclass AND i.indisprimary
+        '''
+        params = [table]
+    elif connection.vendor == 'sqlite':
+        # нужна сборка SQLite с dbstat
+        sql = 'SELECT sum(pgsize) FROM dbstat WHERE name = %s'
+        params = [f'sqlite_autoindex_{table}_1']
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(sql, params)
+        except DatabaseError:
+            return None
+        return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Скорость вставки изделий и размер индекса первичного ключа с ключами '
+        'uuid4 и uuid7 (каждый прогон откатывается)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--batch', type=int, default=1000, help='строк в одном INSERT, как у импорта')
+
+    def handle(self, *args, **options):
+        for name, generate in [('uuid4', uuid.uuid4), ('uuid7', uuid7)]:
+            with rolled_back():
+                order = synthetic_order()
+                start = time.perf_counter()
+                for offset in range(0, options['rows'], options['batch']):
+                    Product.objects.bulk_create([
+                        Product(
+                            id=generate(),
+                            order=order,
+                            title='bench',
+                            color='black',
+                            size='M',
+                            internal_code=f'bench-{offset + number}'
+                        )
+                        for number in range(min(options['batch'], options['rows'] - offset))
+                    ])
+                elapsed = time.perf_counter() - start
+
+                size = primary_key_size(Product)
+                self.stdout.write(
+                    f'{name}: {options["rows"] / elapsed:.0f} строк/с'
+                    + (f', индекс PK {size / 1024 / 1024:.1f} MB' if size is not None else '')
+                )
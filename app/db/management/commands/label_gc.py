@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from db.labels import LABELS_DIR, find_orphan_labels
+from db.models import ProductCode
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы этикеток, на которые не ссылается ни один ProductCode'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=24,
+            help='не трогать файлы моложе указанного числа часов'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='только вывести список файлов'
+        )
+
+    def handle(self, *args, **options):
+        referenced = set(
+            ProductCode.objects
+            .filter(file__startswith=f'{LABELS_DIR}/')
+            .order_by()
+            .values_list('file', flat=True)
+            .distinct()
+        )
+
+        removed = 0
+        for name in find_orphan_labels(referenced, timedelta(hours=options['grace_hours'])):
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                default_storage.delete(name)
+            removed += 1
+
+        action = 'Найдено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(f'{action} файлов: {removed}'))
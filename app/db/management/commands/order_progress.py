@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.services.order_progress import count_progress
+from db.models import Order, OrderProgress
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает или проверяет счетчики OrderProgress по истории Work'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--order',
+            action='append',
+            dest='orders',
+            help='id заказа (можно указать несколько раз), по умолчанию все заказы'
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='только сравнить счетчики с эталоном, ничего не изменяя'
+        )
+
+    def handle(self, *args, **options):
+        orders = None
+        if options['orders']:
+            orders = Order.objects.filter(id__in=options['orders'])
+
+        if options['verify']:
+            self.verify(orders)
+        else:
+            self.rebuild(orders)
+
+    def stored(self, orders):
+        progress = OrderProgress.objects.exclude(amount=0)
+        if orders is not None:
+            progress = progress.filter(order__in=orders)
+
+        return {
+            (row[0], row[1], row[2], row[3], row[4], row[5]): row[6]
+            for row in progress.values_list(
+                'order_id', 'title', 'color', 'size', 'status', 'staff_id', 'amount'
+            )
+        }
+
+    def verify(self, orders):
+        expected = {key: amount for key, amount in count_progress(orders).items() if amount}
+        stored = self.stored(orders)
+
+        mismatches = 0
+        for key in sorted(expected.keys() | stored.keys(), key=str):
+            if expected.get(key, 0) != stored.get(key, 0):
+                mismatches += 1
+                self.stdout.write(
+                    f'{key}: ожидалось {expected.get(key, 0)}, сохранено {stored.get(key, 0)}'
+                )
+
+        if mismatches:
+            raise CommandError(f'Расхождений: {mismatches}')
+        self.stdout.write(self.style.SUCCESS('Счетчики совпадают'))
+
+    def rebuild(self, orders):
+        with transaction.atomic():
+            progress = OrderProgress.objects.all()
+            if orders is not None:
+                progress = progress.filter(order__in=orders)
+            progress.delete()
+
+            create_data = [
+                OrderProgress(
+                    order_id=order_id,
+                    title=title,
+                    color=color,
+                    size=size,
+                    status=status,
+                    staff_id=staff_id,
+                    amount=amount
+                )
+                for (order_id, title, color, size, status, staff_id), amount in count_progress(orders).items()
+                if amount
+            ]
+            OrderProgress.objects.bulk_create(create_data, batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(f'Создано счетчиков: {len(create_data)}'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.services.pdf_import import work_forever
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь задач импорта PDF с кодами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='обработать накопившиеся задачи и выйти'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2,
+            help='пауза между опросами очереди, сек'
+        )
+
+    def handle(self, *args, **options):
+        work_forever(sleep=options['sleep'], once=options['once'])
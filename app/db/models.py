@@ -1,18 +1,16 @@
-import uuid
-
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
-from db.enums import StaffRole, UserStatus, ProductStatus, CodeType, OrderStatus, StatementType
+from db.enums import StaffRole, UserStatus, ProductStatus, CodeType, OrderStatus, StatementType, JobStatus
+from db.labels import is_shared_label
+from db.uuids import uuid7
 
 
 class BaseModel(models.Model):
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
-        editable=False,
-        unique=True,
-        db_index=True
+        default=uuid7,
+        editable=False
     )
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -31,10 +29,8 @@ class BaseModel(models.Model):
 class MyUser(AbstractUser):
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
-        editable=False,
-        unique=True,
-        db_index=True
+        default=uuid7,
+        editable=False
     )
     status = models.IntegerField(
         choices=UserStatus.choices,
@@ -75,6 +71,13 @@ class Order(BaseModel):
         null=True
     )
 
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='order_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='order_status_created_idx'),
+        ]
+
 
 class OrderProduct(models.Model):
     order = models.ForeignKey(
@@ -100,7 +103,9 @@ class Product(BaseModel):
     order = models.ForeignKey(
         'Order',
         on_delete=models.CASCADE,
-        related_name='products'
+        related_name='products',
+        # покрыт составным индексом из Meta.indexes
+        db_index=False
     )
     title = models.CharField(max_length=100)
     color = models.CharField(max_length=100)
@@ -117,12 +122,24 @@ class Product(BaseModel):
         null=True
     )
 
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['order', 'title', 'color', 'size'], name='product_sku_idx'),
+            models.Index(fields=['status'], name='product_status_idx'),
+            # поиск по коду только на равенство, индекс *_like для LIKE не нужен
+            models.Index(fields=['internal_code'], name='product_internal_code_idx'),
+            models.Index(fields=['old_internal_code'], name='product_old_internal_code_idx'),
+        ]
+
 
 class ProductCode(BaseModel):
     product = models.ForeignKey(
         'Product',
         on_delete=models.CASCADE,
-        related_name='codes'
+        related_name='codes',
+        # покрыт составным индексом из Meta.indexes
+        db_index=False
     )
     file = models.FileField(upload_to='codes')
     code = models.CharField(max_length=200)
@@ -132,8 +149,15 @@ class ProductCode(BaseModel):
         null=True
     )
 
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'type'], name='product_code_type_idx'),
+            models.Index(fields=['code'], name='product_code_code_idx'),
+        ]
+
     def delete(self, *args, **kwargs):
-        if self.file:
+        if self.file and not is_shared_label(self.file.name):
             self.file.delete(save=False)
         super().delete(*args, **kwargs)
 
@@ -154,12 +178,24 @@ class Statement(BaseModel):
     type = models.IntegerField(choices=StatementType.choices)
     is_moderated = models.BooleanField(default=False)
 
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['type', '-created_at', '-id'],
+                condition=models.Q(is_moderated=False),
+                name='statement_unmoderated_idx'
+            ),
+        ]
+
 
 class Work(BaseModel):
     product = models.ForeignKey(
         'Product',
         on_delete=models.CASCADE,
-        related_name='works'
+        related_name='works',
+        # покрыт составным индексом из Meta.indexes
+        db_index=False
     )
     staff = models.ForeignKey(
         'StaffProfile',
@@ -173,6 +209,12 @@ class Work(BaseModel):
     )
     status = models.IntegerField(choices=ProductStatus.choices)
 
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'status'], name='work_product_status_idx'),
+        ]
+
 
 class WorkImage(BaseModel):
     work = models.ForeignKey(
@@ -181,3 +223,101 @@ class WorkImage(BaseModel):
         related_name='images'
     )
     image = models.ImageField(upload_to='defects')
+
+
+class OrderProgress(BaseModel):
+    """
+    Счетчики прогресса заказа по SKU.
+    staff заполнен - количество работ сотрудника в статусе status,
+    staff пуст - количество изделий, находящихся сейчас в статусе status.
+    """
+    order = models.ForeignKey(
+        'Order',
+        on_delete=models.CASCADE,
+        related_name='progress'
+    )
+    title = models.CharField(max_length=100)
+    color = models.CharField(max_length=100)
+    size = models.CharField(max_length=100)
+    status = models.IntegerField(choices=ProductStatus.choices)
+    staff = models.ForeignKey(
+        'StaffProfile',
+        on_delete=models.CASCADE,
+        related_name='progress',
+        blank=True,
+        null=True
+    )
+    amount = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['order', 'title', 'color', 'size', 'status', 'staff'],
+                condition=models.Q(staff__isnull=False),
+                name='unique_order_progress_staff'
+            ),
+            models.UniqueConstraint(
+                fields=['order', 'title', 'color', 'size', 'status'],
+                condition=models.Q(staff__isnull=True),
+                name='unique_order_progress_product'
+            ),
+        ]
+
+
+class PDFImportJob(BaseModel):
+    order = models.ForeignKey(
+        'Order',
+        on_delete=models.CASCADE,
+        related_name='pdf_imports'
+    )
+    staff = models.ForeignKey(
+        'StaffProfile',
+        on_delete=models.SET_NULL,
+        related_name='pdf_imports',
+        blank=True,
+        null=True
+    )
+    type = models.IntegerField(choices=CodeType.choices)
+    status = models.IntegerField(
+        choices=JobStatus.choices,
+        default=JobStatus.NEW
+    )
+    file = models.FileField(upload_to='imports')
+    product_title = models.CharField(max_length=100)
+    color = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True
+    )
+    size = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True
+    )
+    first_page = models.PositiveIntegerField(
+        blank=True,
+        null=True
+    )
+    last_page = models.PositiveIntegerField(
+        blank=True,
+        null=True
+    )
+    pages_total = models.PositiveIntegerField(default=0)
+    pages_done = models.PositiveIntegerField(default=0)
+    result = models.JSONField(
+        blank=True,
+        null=True
+    )
+    error = models.TextField(
+        blank=True,
+        null=True
+    )
+    started_at = models.DateTimeField(
+        blank=True,
+        null=True
+    )
+    finished_at = models.DateTimeField(
+        blank=True,
+        null=True
+    )
@@ -1,10 +1,38 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from db.models import ProductCode
+from db.cache import bump_version, invalidate_staff
+from db.labels import is_shared_label
+from db.models import ClientProfile, MyUser, StaffProfile, Order, OrderProduct, ProductDetail, ProductCode
+
+# модели, от которых зависят закэшированные списки (api.cache)
+CACHED_MODELS = (ClientProfile, MyUser, StaffProfile, Order, OrderProduct, ProductDetail)
 
 
 @receiver(post_delete, sender=ProductCode)
 def delete_file_on_delete(sender, instance, **kwargs):
-    if instance.file:
-        instance.file.delete(save=False)
\ No newline at end of file
+    # общие файлы этикеток удаляет label_gc
+    if instance.file and not is_shared_label(instance.file.name):
+        instance.file.delete(save=False)
+
+
+def invalidate_cache(sender, instance, **kwargs):
+    bump_version(sender)
+
+
+@receiver([post_save, post_delete], sender=ProductCode)
+def invalidate_product_codes(sender, instance, **kwargs):
+    bump_version(ProductCode, instance.product_id)
+
+
+@receiver([post_save, post_delete], sender=StaffProfile)
+def invalidate_staff_role(sender, instance, **kwargs):
+    # роль меняется не только через API, но и в админке
+    invalidate_staff(instance.user_id)
+
+
+# обработчик без sender отключает быстрое удаление (DELETE без выборки)
+# у всех моделей, поэтому подписка идет по каждой модели отдельно
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_cache, sender=model)
+    post_delete.connect(invalidate_cache, sender=model)
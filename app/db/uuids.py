@@ -0,0 +1,15 @@
+import os
+import time
+import uuid
+
+
+def uuid7():
+    """
+    UUID версии 7 (RFC 9562): 48 бит времени в миллисекундах + 74 случайных бита.
+    Новые ключи растут по времени и дописываются в конец индекса.
+    """
+    timestamp = time.time_ns() // 1_000_000
+    value = (timestamp & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
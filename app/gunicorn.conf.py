@@ -0,0 +1,51 @@
+"""
+Gunicorn config: `gunicorn -c gunicorn.conf.py`.
+
+GUNICORN_POOL=web - short requests (scans, lists), workers by CPU count
+and periodic recycling. GUNICORN_POOL=pdf - separate pool for
+/api/v1/director/pdf/*: few workers, long timeouts and no recycling,
+since in PDF_IMPORT_WORKER='thread' mode imports run inside the worker.
+"""
+import multiprocessing
+
+import decouple
+
+POOL = decouple.config('GUNICORN_POOL', default='web')
+CPU_COUNT = multiprocessing.cpu_count()
+
+wsgi_app = 'conf.asgi:application'
+worker_class = 'uvicorn_worker.UvicornWorker'
+bind = decouple.config('GUNICORN_BIND', default='0.0.0.0:8000')
+
+# Django, the URLconf with the views, fitz and PIL are imported once in
+# the master (see conf/asgi.py) and shared by workers through copy-on-write
+preload_app = decouple.config('GUNICORN_PRELOAD', default=True, cast=bool)
+
+if POOL == 'pdf':
+    workers = decouple.config('GUNICORN_WORKERS', default=2, cast=int)
+    timeout = decouple.config('GUNICORN_TIMEOUT', default=900, cast=int)
+    graceful_timeout = timeout
+    max_requests = 0
+else:
+    workers = decouple.config('GUNICORN_WORKERS', default=CPU_COUNT * 2 + 1, cast=int)
+    timeout = decouple.config('GUNICORN_TIMEOUT', default=30, cast=int)
+    graceful_timeout = 30
+    max_requests = decouple.config('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+    max_requests_jitter = max_requests // 10
+
+keepalive = 5
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    # соединения, открытые в мастере при preload, не должны делиться между воркерами
+    from django.db import connections
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    # в режиме PDF_IMPORT_WORKER='thread' импорт живет в воркерах пула pdf,
+    # задачи упавшего воркера подбирает следующий
+    if POOL == 'pdf':
+        from api.services.pdf_import import resume_jobs
+        resume_jobs()